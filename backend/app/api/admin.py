@@ -1,12 +1,22 @@
 # backend/app/api/admin.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime, timedelta
 
 from .. import crud, schemas, models
-from ..database import get_db
+from ..database import get_db, engine, async_engine
+from ..db_pool import pool_stats
+from ..pagination import PageParams, set_next_cursor
+from ..json_responses import list_response
 from app.dependencies import get_current_admin_user
+from ..security import principal_cache, token_cache
+from ..stats import counters
+from ..etags import CACHE_CONTROL, is_fresh, make_etag, not_modified
+from ..exports import MEDIA_TYPES, stream_export
+from ..occupancy import occupancy_store
 
 router = APIRouter()
 
@@ -14,27 +24,114 @@ router = APIRouter()
 # --- ADD THIS NEW ENDPOINT ---
 @router.get("/stats")
 def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
     admin_user: models.User = Depends(get_current_admin_user)
 ):
     """
     Get statistics for the admin dashboard.
+    Served from the live counters in stats.py, no DB queries
+    (304 if If-None-Match has the current ETag).
+    (Admin Only)
+    """
+    etag = make_etag("stats", counters.version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    version, snapshot = counters.versioned_snapshot()
+    response.headers["ETag"] = make_etag("stats", version)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return snapshot
+
+@router.get("/auth-cache")
+def get_auth_cache_stats(
+    admin_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Hit/miss counters of the verified-token and principal caches.
+    (Admin Only)
+    """
+    return {
+        "tokens": token_cache.stats(),
+        "principals": principal_cache.stats(),
+    }
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: Literal["gate-logs", "bookings", "payments"] = Path(...),
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    admin_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Stream the full history of a table as CSV or NDJSON, optionally
+    gzipped. `date_to` is exclusive.
     (Admin Only)
     """
-    return crud.get_admin_stats(db)
+    filename = f"{dataset}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(dataset, format, gzip=gzip, date_from=date_from, date_to=date_to),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/db-pool")
+def get_db_pool_stats(
+    admin_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Connection pool usage of this worker (sync and async engines):
+    checked-out connections, checkout wait histogram, overflow and timeouts.
+    (Admin Only)
+    """
+    return {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.pool),
+    }
 
 # --- ADD THIS NEW ENDPOINT ---
+@router.get("/analytics/occupancy")
+def get_occupancy_analytics(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    granularity: Literal["hour", "day"] = "hour",
+    group_by: Literal["total", "vehicle_type", "slot"] = "vehicle_type",
+    include_reserved: bool = False,
+    db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Hourly or daily slot occupancy (0-1) in total, per vehicle type or per
+    slot, from the slot status history. Defaults to the last 7 days (UTC).
+    (Admin Only)
+    """
+    date_to = date_to or datetime.utcnow()
+    date_from = date_from or date_to - timedelta(days=7)
+    if date_from >= date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must be before date_to")
+    try:
+        result = occupancy_store.occupancy(db, date_from, date_to, granularity, group_by, include_reserved)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Returned as-is: orjson writes the NumPy arrays directly
+    return ORJSONResponse(result)
+
 @router.get("/users", response_model=List[schemas.User])
 def read_all_users(
+    response: Response,
+    page: PageParams = Depends(),
+    role: Optional[models.UserRole] = None,
     db: Session = Depends(get_db),
     admin_user: models.User = Depends(get_current_admin_user)
 ):
     """
-    Get a list of all users.
+    Get a page of users (next page: X-Next-Cursor header).
     (Admin Only)
     """
-    users = crud.get_users(db)
-    return users
+    users, next_cursor = crud.get_users(db, page, role=role)
+    set_next_cursor(response, next_cursor)
+    return list_response(schemas.User, users, response)
 
 
 @router.post("/users/create", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
@@ -3,38 +3,48 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from .. import crud, schemas, models
-from ..database import get_db
+from .. import crud, crud_async, schemas, models
+from ..database import get_db, get_async_db
 from ..dependencies import get_current_user 
-from ..security import create_access_token, verify_password
+from ..security import (
+    create_access_token, get_password_hash_async, verify_password, verify_password_and_update_async
+)
 from ..core.config import settings
-from ..security import create_access_token, verify_password
 
 
 router = APIRouter()
 
 @router.post("/signup", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def create_new_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def create_new_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    return crud.create_user(db=db, user=user)
+    hashed_password = await get_password_hash_async(user.password)
+    return await crud_async.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Hashing is awaited on the password-hash pool, so a login holds no thread
+    user = await crud_async.get_user_by_email(db, email=form_data.username)
+    is_valid, new_hash = (False, None)
+    if user:
+        is_valid, new_hash = await verify_password_and_update_async(form_data.password, user.hashed_password)
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+    if new_hash:
+        # Hash made with old argon2 parameters: upgrade it transparently
+        await crud_async.update_user_password_hash(db, user=user, hashed_password=new_hash)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
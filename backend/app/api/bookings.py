@@ -1,16 +1,21 @@
 # backend/app/api/bookings.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-from .. import pdf_generator
-from .. import crud, schemas, models
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from datetime import datetime
+from .. import pdf_generator, qr_generator
+from .. import crud, crud_async, schemas, models
+from ..database import get_db, get_async_db
+from ..booking_index import booking_index, naive_utc
+from ..pagination import PageParams, set_next_cursor
+from ..json_responses import list_response
+from ..etags import is_fresh
 # --- THIS IS THE FIX ---
 from ..dependencies import get_current_user # Was 'from app.dependencies...'
 # ------------------------
-from fastapi.responses import FileResponse
-import os
 import asyncio
 
 router = APIRouter()
@@ -18,52 +23,97 @@ router = APIRouter()
 @router.post("/", response_model=schemas.Booking, status_code=status.HTTP_201_CREATED)
 async def create_new_booking(
     booking: schemas.BookingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Create a new booking for the currently logged-in user.
     """
-    
-    is_available = crud.check_slot_availability(
-        db, 
-        slot_id=booking.slot_id, 
-        start_time=booking.start_time, 
-        end_time=booking.end_time
-    )
-    
-    if not is_available:
+    # The in-memory index answers most requests. It can lag behind other
+    # workers, so a rejection is confirmed against the database before the
+    # 409; create_booking re-checks under the slot lock either way.
+    new_booking = None
+    available = booking_index.is_available(booking.slot_id, booking.start_time, booking.end_time)
+    if not available:
+        available = await crud_async.check_slot_availability(
+            db, booking.slot_id, naive_utc(booking.start_time), naive_utc(booking.end_time)
+        )
+        # End the read transaction: create_booking must start a fresh one
+        await db.rollback()
+    if available:
+        new_booking = await crud_async.create_booking(db=db, booking=booking, user_id=current_user.id)
+
+    if new_booking is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="This slot is not available for the requested time. It may be already booked."
         )
-        
-    new_booking = await crud.create_booking(db=db, booking=booking, user_id=current_user.id)
     return new_booking
 
 
+@router.post("/auto", response_model=schemas.Booking, status_code=status.HTTP_201_CREATED)
+async def create_auto_booking(
+    booking: schemas.AutoBookingCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Create a booking on the best free slot for the vehicle type.
+    The server picks the slot, so the client does not retry on 409.
+    """
+    ranked = await crud_async.rank_free_slots(db, booking.vehicle_type, booking.start_time, booking.end_time)
+    slot_ids = [slot.id for slot in ranked]
+    # End the read transaction: create_booking must start a fresh one
+    await db.rollback()
+
+    for slot_id in slot_ids:
+        # Taken meanwhile (create_booking re-checks under the slot lock): try the next one
+        new_booking = await crud_async.create_booking(db=db, booking=booking.for_slot(slot_id), user_id=current_user.id)
+        if new_booking is not None:
+            return new_booking
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="No free slot is available for this vehicle type at the requested time."
+    )
+
+
 @router.get("/me", response_model=List[schemas.Booking])
 def get_my_bookings(
+    response: Response,
+    page: PageParams = Depends(),
+    status: Optional[models.BookingStatus] = None,
+    slot_id: Optional[int] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Get all bookings for the currently logged-in user.
+    Get a page of bookings for the currently logged-in user, newest first
+    (next page: X-Next-Cursor header). `start_to` is exclusive.
     """
-    bookings = crud.get_bookings_by_user(db, user_id=current_user.id)
-    return bookings
+    bookings, next_cursor = crud.get_bookings_by_user(
+        db, user_id=current_user.id, page=page, status=status, slot_id=slot_id,
+        start_from=start_from, start_to=start_to
+    )
+    set_next_cursor(response, next_cursor)
+    return list_response(schemas.Booking, bookings, response)
 
 
-@router.get("/receipt/{booking_id}", response_class=FileResponse)
-def get_booking_receipt(
+@router.get("/receipt/{booking_id}", response_class=Response)
+async def get_booking_receipt(
+    request: Request,
     booking_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Generates and returns a PDF receipt for a specific booking.
+    Returns the PDF receipt for a specific booking.
+    Cached receipts are reused until a printed field changes, and a client
+    that already has the current one gets a 304.
     """
-    booking = db.query(models.Booking).get(booking_id)
+    booking = await crud_async.get_booking(db, booking_id)
 
     if not booking:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
@@ -71,20 +121,42 @@ def get_booking_receipt(
     if booking.user_id != current_user.id and current_user.role != models.UserRole.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to view this receipt")
 
-    receipts_dir = os.path.join(os.path.dirname(__file__), "..", "..", "static", "receipts")
-    os.makedirs(receipts_dir, exist_ok=True)
-    
     pdf_file_name = f"receipt_{booking.booking_id_str}.pdf"
-    pdf_file_path = os.path.join(receipts_dir, pdf_file_name)
+    fields = pdf_generator.receipt_fields(booking)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{pdf_file_name}"',
+        "ETag": f'"{pdf_generator.receipt_digest(fields)}"',
+    }
+    if is_fresh(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
     try:
-        pdf_generator.generate_booking_receipt(booking, pdf_file_path)
+        pdf = await pdf_generator.get_booking_receipt(booking.id, fields)
     except Exception as e:
         print(f"PDF Generation Error: {e}")
         raise HTTPException(status_code=500, detail="Could not generate PDF receipt.")
 
-    return FileResponse(
-        pdf_file_path, 
-        media_type='application/pdf', 
-        filename=pdf_file_name
-    )
\ No newline at end of file
+    return Response(content=pdf, media_type='application/pdf', headers=headers)
+
+
+@router.get("/qr/{booking_id_str}")
+async def get_booking_qr(
+    request: Request,
+    booking_id_str: str = Path(..., pattern=r"^SPS-\d+$"),
+    format: Literal["png", "svg"] = "png"
+):
+    """
+    Renders the QR code of a booking (e.g., "SPS-1002") as PNG or SVG.
+    The image never changes, so it is cached in memory and by clients.
+    """
+    etag = qr_generator.qr_etag(booking_id_str, format)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Rendering is CPU bound, keep it off the event loop
+    content = await run_in_threadpool(qr_generator.render_qr, booking_id_str, format)
+    return Response(content=content, media_type=qr_generator.MEDIA_TYPES[format], headers=headers)
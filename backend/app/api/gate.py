@@ -1,12 +1,16 @@
 # backend/app/api/gate.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
-from .. import crud, schemas, models
-from ..database import get_db
+from .. import crud, crud_async, schemas, models
+from ..database import get_db, get_async_db
+from ..pagination import PageParams, set_next_cursor
+from ..json_responses import list_response
 from ..dependencies import get_current_staff_user 
 
 router = APIRouter()
@@ -17,14 +21,14 @@ class GateCheckinRequest(BaseModel):
 @router.post("/checkin", response_model=schemas.Booking)
 async def gate_check_in(
     request_data: GateCheckinRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     staff_user: models.User = Depends(get_current_staff_user)
 ):
     """
     Check in a vehicle by its Booking ID (e.g., "SPS-1002").
     (Staff/Admin Only)
     """
-    booking = crud.get_booking_by_id_str(db, booking_id_str=request_data.booking_id_str)
+    booking = await crud_async.get_booking_by_id_str(db, booking_id_str=request_data.booking_id_str)
     
     if not booking:
         raise HTTPException(status_code=404, detail="Booking ID not found")
@@ -35,21 +39,26 @@ async def gate_check_in(
             detail="Booking is not 'upcoming'"
         )
     
-    crud.create_gate_log(db, staff_id=staff_user.id, booking=booking, action="check-in")
-    return await crud.check_in_booking(db, booking=booking)
+    booking = await crud_async.check_in_booking(db, booking=booking, staff_id=staff_user.id)
+    if booking is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking status changed during check-in, please scan again"
+        )
+    return booking
 
 
 @router.post("/checkout", response_model=schemas.Booking)
 async def gate_check_out(
     request_data: GateCheckinRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     staff_user: models.User = Depends(get_current_staff_user)
 ):
     """
     Check out a vehicle by its Booking ID (e.g., "SPS-1002").
     (Staff/Admin Only)
     """
-    booking = crud.get_booking_by_id_str(db, booking_id_str=request_data.booking_id_str)
+    booking = await crud_async.get_booking_by_id_str(db, booking_id_str=request_data.booking_id_str)
     
     if not booking:
         raise HTTPException(status_code=404, detail="Booking ID not found")
@@ -60,17 +69,52 @@ async def gate_check_out(
             detail="Booking is not 'active'"
         )
     
-    crud.create_gate_log(db, staff_id=staff_user.id, booking=booking, action="check-out")
-    return await crud.check_out_booking(db, booking=booking)
+    booking = await crud_async.check_out_booking(db, booking=booking, staff_id=staff_user.id)
+    if booking is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking status changed during check-out, please scan again"
+        )
+    return booking
+
+
+@router.post("/events:batch", response_model=schemas.GateEventBatchResult)
+async def gate_events_batch(
+    batch: schemas.GateEventBatch,
+    db: AsyncSession = Depends(get_async_db),
+    staff_user: models.User = Depends(get_current_staff_user)
+):
+    """
+    Replay check-in/check-out scans recorded by an offline gate terminal.
+    Events are applied in order in one transaction; each one gets a
+    result ('applied', 'duplicate' or 'rejected'). Safe to resend:
+    events are deduplicated on client_event_id.
+    (Staff/Admin Only)
+    """
+    results = await crud_async.apply_gate_events(db, batch.events, staff_id=staff_user.id)
+    return {"results": results}
 
 
 @router.get("/logs", response_model=List[schemas.GateLog])
 def get_logs(
+    response: Response,
+    page: PageParams = Depends(),
+    staff_id: Optional[int] = None,
+    action: Optional[str] = None,
+    slot_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
     db: Session = Depends(get_db),
     staff_user: models.User = Depends(get_current_staff_user)
 ):
     """
-    Get all gate logs.
+    Get a page of gate logs, newest first (next page: X-Next-Cursor header).
+    `date_to` is exclusive.
     (Staff/Admin Only)
     """
-    return crud.get_gate_logs(db)
\ No newline at end of file
+    logs, next_cursor = crud.get_gate_logs(
+        db, page, staff_id=staff_id, action=action, slot_id=slot_id,
+        date_from=date_from, date_to=date_to
+    )
+    set_next_cursor(response, next_cursor)
+    return list_response(schemas.GateLog, logs, response)
\ No newline at end of file
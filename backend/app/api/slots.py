@@ -1,11 +1,13 @@
 # backend/app/api/slots.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .. import crud, schemas, models
 from ..database import get_db
+from ..slot_board import slot_board
+from ..etags import CACHE_CONTROL, is_fresh, make_etag, not_modified
 from app.dependencies import get_current_user, get_current_admin_user
 
 router = APIRouter()
@@ -30,18 +32,73 @@ def create_new_slot(
     return crud.create_slot(db=db, slot=slot)
 
 
-@router.get("/", response_model=List[schemas.Slot])
-def read_all_slots(
+def _bulk_conflict(message: str, slot_numbers: List[str]) -> HTTPException:
+    shown = ", ".join(slot_numbers[:20])
+    if len(slot_numbers) > 20:
+        shown += f" (+{len(slot_numbers) - 20} more)"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{message}: {shown}")
+
+
+@router.post("/bulk", response_model=List[schemas.Slot], status_code=status.HTTP_201_CREATED)
+def create_slots_in_bulk(
+    bulk: schemas.SlotBulkCreate,
     db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Create many slots at once, listed one by one and/or as ranges
+    ("L2-A001..L2-A400"). All or nothing.
+    (Admin Only)
+    """
+    try:
+        created, conflicts = crud.create_slots_bulk(db, bulk)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if conflicts:
+        raise _bulk_conflict("These slot numbers already exist or are repeated", conflicts)
+    return created
+
+
+@router.patch("/bulk", response_model=List[schemas.Slot])
+def update_slots_in_bulk(
+    bulk: schemas.SlotBulkUpdate,
+    db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Update many slots at once, selected by slot number or range. All or nothing.
+    (Admin Only)
+    """
+    try:
+        updated, missing = crud.update_slots_bulk(db, bulk)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if missing:
+        raise _bulk_conflict("These slots do not exist", missing)
+    return updated
+
+
+@router.get("/", response_model=List[schemas.Slot])
+async def read_all_slots(
+    request: Request,
+    status: Optional[models.SlotStatus] = None,
+    vehicle_type: Optional[str] = None,
     # Any logged-in user can view slots:
     current_user: models.User = Depends(get_current_user) 
 ):
     """
-    Get a list of all parking slots.
+    Get all parking slots, optionally filtered (served from the slot board;
+    304 if If-None-Match has the current ETag).
     (Any Logged-in User)
     """
-    slots = crud.get_slots(db)
-    return slots
+    etag = make_etag("slots", slot_board.version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    return Response(
+        content=slot_board.body(status, vehicle_type),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
 
 # --- ADD THIS NEW ENDPOINT ---
 @router.delete("/{slot_id}", response_model=schemas.Slot)
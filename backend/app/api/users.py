@@ -1,10 +1,13 @@
 # backend/app/api/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from .. import crud, schemas, models
 from ..database import get_db
+from ..pagination import PageParams, set_next_cursor
+from ..json_responses import list_response
 from ..dependencies import get_current_user
-from typing import List # <-- Make sure List is imported
+from typing import List, Optional # <-- Make sure List is imported
+from datetime import datetime
 
 router = APIRouter()
 
@@ -42,13 +45,17 @@ def create_vehicle_for_user(
 
 @router.get("/me/vehicles", response_model=List[schemas.Vehicle])
 def read_vehicles_for_user(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Get all vehicles for the current user.
+    Get a page of vehicles for the current user (next page: X-Next-Cursor header).
     """
-    return crud.get_vehicles_by_user(db, user_id=current_user.id)
+    vehicles, next_cursor = crud.get_vehicles_by_user(db, user_id=current_user.id, page=page)
+    set_next_cursor(response, next_cursor)
+    return list_response(schemas.Vehicle, vehicles, response)
 
 
 @router.delete("/me/vehicles/{vehicle_id}", response_model=schemas.Vehicle)
@@ -70,10 +77,21 @@ def delete_vehicle_for_user(
 
 @router.get("/me/payments", response_model=List[schemas.Payment])
 def read_payments_for_user(
+    response: Response,
+    page: PageParams = Depends(),
+    status: Optional[models.PaymentStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Get all payments for the current user.
+    Get a page of payments for the current user, newest first
+    (next page: X-Next-Cursor header). `created_to` is exclusive.
     """
-    return crud.get_payments_by_user(db, user_id=current_user.id)
\ No newline at end of file
+    payments, next_cursor = crud.get_payments_by_user(
+        db, user_id=current_user.id, page=page, status=status,
+        created_from=created_from, created_to=created_to
+    )
+    set_next_cursor(response, next_cursor)
+    return list_response(schemas.Payment, payments, response)
\ No newline at end of file
@@ -0,0 +1,200 @@
+# backend/app/booking_index.py
+
+import threading
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from . import models
+from .database import SessionLocal
+from .websocket_manager import manager
+
+# Only these bookings block a slot (same rule as crud_async.check_slot_availability)
+BLOCKING_STATUSES = (models.BookingStatus.upcoming, models.BookingStatus.active)
+
+
+def naive_utc(value: datetime) -> datetime:
+    # Timestamps are stored and indexed as naive UTC; clients may send "...Z"
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+Intervals = Dict[int, List[Tuple[datetime, datetime, int]]]
+
+
+def _add(slots: Intervals, slot_id: int, interval: Tuple[datetime, datetime, int]):
+    intervals = slots.setdefault(slot_id, [])
+    i = bisect_left(intervals, interval)
+    if i == len(intervals) or intervals[i] != interval:  # a replayed add is a no-op
+        intervals.insert(i, interval)
+
+
+def _discard(slots: Intervals, slot_id: int, booking_id: int):
+    intervals = slots.get(slot_id)
+    if not intervals:
+        return
+    for i, interval in enumerate(intervals):
+        if interval[2] == booking_id:
+            del intervals[i]
+            break
+
+
+def _remove_slot(slots: Intervals, slot_id: int):
+    slots.pop(slot_id, None)
+
+
+class SlotIntervalIndex:
+    """
+    In-memory index of the blocking bookings of every slot.
+
+    Each slot keeps its bookings as a list of (start, end, booking_id) sorted
+    by start time. Bookings of one slot never overlap (they all passed the
+    availability check), so the ends are sorted too and an overlap check is a
+    single bisect: only the booking starting right before `end_time` can
+    overlap the requested window.
+
+    Every worker keeps its own copy. Changes are made through publish_add(),
+    publish_discard() and publish_remove_slot(), which go over the broadcast
+    bus so all copies see them. The database stays the final guard.
+    """
+
+    def __init__(self):
+        self._slots: Intervals = {}
+        self._lock = threading.Lock()
+        # Changes applied while resync() loads, replayed onto the new index
+        self._missed: Optional[List[Tuple[Callable, tuple]]] = None
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Reloads the whole index from the bookings table. Returns the number of
+        indexed bookings.
+        """
+        slots = self._load(db)
+        with self._lock:
+            self._slots = slots
+        return sum(len(intervals) for intervals in slots.values())
+
+    async def resync(self) -> int:
+        """
+        rebuild() in the threadpool, for a running worker whose bus link
+        was down (see ConnectionManager.on_link). Changes arriving while
+        the bookings load are replayed onto the new index.
+        """
+        with self._lock:
+            self._missed = []
+        try:
+            slots = await run_in_threadpool(self._load_from_db)
+            with self._lock:
+                for change, args in self._missed:
+                    change(slots, *args)
+                self._slots = slots
+        finally:
+            with self._lock:
+                self._missed = None
+        return sum(len(intervals) for intervals in slots.values())
+
+    def _load_from_db(self) -> Intervals:
+        with SessionLocal() as db:
+            return self._load(db)
+
+    @staticmethod
+    def _load(db: Session) -> Intervals:
+        rows = db.query(
+            models.Booking.slot_id,
+            models.Booking.start_time,
+            models.Booking.end_time,
+            models.Booking.id
+        ).filter(
+            models.Booking.status.in_(BLOCKING_STATUSES)
+        ).order_by(models.Booking.slot_id, models.Booking.start_time).all()
+
+        slots: Intervals = {}
+        for slot_id, start_time, end_time, booking_id in rows:
+            slots.setdefault(slot_id, []).append((naive_utc(start_time), naive_utc(end_time), booking_id))
+        return slots
+
+    def _change(self, change: Callable, *args):
+        with self._lock:
+            change(self._slots, *args)
+            if self._missed is not None:
+                self._missed.append((change, args))
+
+    def add(self, slot_id: int, start_time: datetime, end_time: datetime, booking_id: int):
+        self._change(_add, slot_id, (naive_utc(start_time), naive_utc(end_time), booking_id))
+
+    def discard(self, slot_id: int, booking_id: int):
+        """
+        Removes a booking once it stops blocking the slot
+        (checked out or cancelled).
+        """
+        self._change(_discard, slot_id, booking_id)
+
+    def remove_slot(self, slot_id: int):
+        self._change(_remove_slot, slot_id)
+
+    def is_available(self, slot_id: int, start_time: datetime, end_time: datetime) -> bool:
+        return self.find_gap(slot_id, start_time, end_time) is not None
+
+    def find_gap(
+        self, slot_id: int, start_time: datetime, end_time: datetime
+    ) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Returns the free gap of the slot that contains the requested window as
+        (previous booking end, next booking start), where None means unbounded.
+        Returns None if the window overlaps an existing booking.
+        """
+        start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+        with self._lock:
+            intervals = self._slots.get(slot_id)
+            if not intervals:
+                return (None, None)
+            # First booking that starts at or after end_time
+            i = bisect_left(intervals, (end_time,))
+            prev_end = None
+            if i > 0:
+                prev_end = intervals[i - 1][1]
+                if prev_end > start_time:
+                    return None
+            next_start = intervals[i][0] if i < len(intervals) else None
+            return (prev_end, next_start)
+
+
+# Create a single, global instance
+booking_index = SlotIntervalIndex()
+
+
+def publish_add(slot_id: int, start_time: datetime, end_time: datetime, booking_id: int):
+    """Adds a booking to the index of every worker. Safe from any thread."""
+    manager.publish_event("bookings", {
+        "op": "add", "slot_id": slot_id, "booking_id": booking_id,
+        "start_time": naive_utc(start_time).isoformat(), "end_time": naive_utc(end_time).isoformat()
+    })
+
+
+def publish_discard(slot_id: int, booking_id: int):
+    manager.publish_event("bookings", {"op": "discard", "slot_id": slot_id, "booking_id": booking_id})
+
+
+def publish_remove_slot(slot_id: int):
+    manager.publish_event("bookings", {"op": "remove_slot", "slot_id": slot_id})
+
+
+def _on_bookings_event(message: dict):
+    op = message["op"]
+    if op == "add":
+        booking_index.add(
+            message["slot_id"],
+            datetime.fromisoformat(message["start_time"]),
+            datetime.fromisoformat(message["end_time"]),
+            message["booking_id"]
+        )
+    elif op == "discard":
+        booking_index.discard(message["slot_id"], message["booking_id"])
+    elif op == "remove_slot":
+        booking_index.remove_slot(message["slot_id"])
+
+
+manager.subscribe("bookings", _on_bookings_event)
@@ -0,0 +1,171 @@
+# backend/app/broadcast_bus.py
+#
+# Delivers broadcast messages to the ConnectionManager of every worker.
+# "memory" is for a single worker; "unix" links all uvicorn workers of
+# one host through a Unix-domain socket hub.
+
+import asyncio
+import json
+import os
+from typing import Callable, Optional, Set
+
+Handler = Callable[[dict], None]
+LinkHandler = Callable[[], None]
+
+
+class InProcessBus:
+    """Single worker: a published message goes straight to the local handler."""
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler, on_link: Optional[LinkHandler] = None):
+        # Never loses a message, so on_link is never needed
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    def publish(self, message: dict):
+        if self._handler is not None:
+            self._handler(message)
+
+
+class UnixSocketBus:
+    """
+    Several workers on one host.
+
+    The worker holding the lock file `<path>.lock` is the hub: it listens on
+    the socket and relays every line it receives to all other workers. The
+    other workers connect to it as clients. If the hub dies its lock is
+    released and the next worker that retries takes over.
+
+    Every message is also delivered locally right away. Messages published
+    while a worker has no hub link (at startup, or while the hub fails
+    over) only reach that worker, and it misses the others' meanwhile.
+    `on_link` is called each time the worker (re)joins, as hub or client,
+    so it can reload whatever it keeps from bus messages.
+
+    Writes never wait on a peer. One that stops reading is dropped once
+    MAX_BUFFERED_BYTES are queued for it, instead of growing the buffer
+    without bound; it reconnects and resyncs like after a failover.
+    """
+
+    RETRY_SECONDS = 0.5
+    MAX_BUFFERED_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handler: Optional[Handler] = None
+        self._on_link: Optional[LinkHandler] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock_fd: Optional[int] = None
+        self._hub_clients: Set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None  # our link to the hub
+
+    async def start(self, handler: Handler, on_link: Optional[LinkHandler] = None):
+        self._handler = handler
+        self._on_link = on_link
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for writer in list(self._hub_clients):
+            writer.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the lock
+            self._lock_fd = None
+
+    def publish(self, message: dict):
+        line = json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._deliver(line)
+        if self._lock_fd is not None:
+            self._relay(line, origin=None)
+        elif self._writer is not None:
+            self._send(self._writer, line)
+
+    def _deliver(self, line: bytes):
+        if self._handler is not None:
+            self._handler(json.loads(line))
+
+    def _linked(self):
+        if self._on_link is not None:
+            self._on_link()
+
+    def _relay(self, line: bytes, origin: Optional[asyncio.StreamWriter]):
+        for writer in list(self._hub_clients):
+            if writer is not origin:
+                self._send(writer, line)
+
+    def _send(self, writer: asyncio.StreamWriter, line: bytes):
+        if writer.transport.get_write_buffer_size() > self.MAX_BUFFERED_BYTES:
+            writer.transport.abort()  # stalled peer; its read loop ends and cleans up
+            return
+        writer.write(line)
+
+    def _try_become_hub(self) -> bool:
+        import fcntl  # Unix only
+
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _run(self):
+        while True:
+            if self._try_become_hub():
+                await self._serve_as_hub()
+                return
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=self.MAX_BUFFERED_BYTES)
+            except OSError:
+                await asyncio.sleep(self.RETRY_SECONDS)
+                continue
+            self._writer = writer
+            self._linked()
+            try:
+                while line := await reader.readline():
+                    self._deliver(line)
+            except (OSError, ValueError):
+                pass  # hub went away, or a line over the limit: reconnect
+            finally:
+                self._writer = None
+                writer.close()
+
+    async def _serve_as_hub(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale socket of a dead hub
+        server = await asyncio.start_unix_server(self._handle_worker, path=self.path, limit=self.MAX_BUFFERED_BYTES)
+        self._linked()
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._hub_clients.add(writer)
+        try:
+            while line := await reader.readline():
+                self._deliver(line)
+                self._relay(line, origin=writer)
+        except (OSError, ValueError, asyncio.CancelledError):
+            pass  # worker went away (or sent a line over the limit), or the hub is shutting down
+        finally:
+            self._hub_clients.discard(writer)
+            writer.close()
+
+
+def create_bus(backend: str, socket_path: str):
+    if backend == "unix":
+        return UnixSocketBus(socket_path)
+    if backend == "memory":
+        return InProcessBus()
+    raise ValueError(f"Unknown BROADCAST_BACKEND: {backend!r}")
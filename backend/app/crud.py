@@ -1,21 +1,36 @@
 # backend/app/crud.py
 
 from datetime import datetime
-from typing import List
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from collections import Counter
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session, joinedload, load_only
 from .security import get_password_hash
 from . import models, schemas
-import os # <-- Import os
-import json
 from .websocket_manager import manager # <-- 1. Import the manager
-from .security import verify_password, get_password_hash
-from sqlalchemy.orm import Session 
-from sqlalchemy import func
-
-# --- 1. IMPORT QRCODE ---
-import qrcode
-from io import BytesIO
+from .booking_index import publish_remove_slot
+from .security import invalidate_principal
+from . import stats
+from . import slot_ranges
+from .pagination import PageParams, paginate
+
+# Eager loads for list responses: the nested "lite" objects come in the
+# same query (JOIN) instead of one lazy load per row, with only the
+# columns the schemas serialize
+BOOKING_LIST_OPTIONS = (
+    joinedload(models.Booking.user).load_only(models.User.id, models.User.email),
+    joinedload(models.Booking.slot).load_only(models.Slot.id, models.Slot.slot_number),
+    joinedload(models.Booking.vehicle).load_only(models.Vehicle.id, models.Vehicle.license_plate),
+)
+GATE_LOG_LIST_OPTIONS = (
+    joinedload(models.GateLog.staff).load_only(models.User.id, models.User.email),
+)
+PAYMENT_LIST_OPTIONS = (
+    load_only(
+        models.Payment.id, models.Payment.booking_id, models.Payment.status, models.Payment.amount,
+        models.Payment.payment_method, models.Payment.provider_transaction_id, models.Payment.created_at
+    ),
+)
 
 # User CRUD
 def get_user_by_email(db: Session, email: str) -> models.User | None:
@@ -31,24 +46,35 @@ def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    stats.record_change(users=1)
     return db_user
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> list[models.User]:
+def get_users(
+    db: Session,
+    page: PageParams,
+    role: Optional[models.UserRole] = None
+) -> Tuple[List[models.User], Optional[str]]:
     """
-    Reads a list of all users.
+    Reads a page of users by id, optionally only one role.
     """
-    return db.query(models.User).offset(skip).limit(limit).all()
+    query = db.query(models.User)
+    if role is not None:
+        query = query.filter(models.User.role == role)
+    return paginate(query, [models.User.id], page)
 
 def update_user(db: Session, user: models.User, user_in: schemas.UserUpdate) -> models.User:
     """
     Update a user's details.
     """
+    old_email = user.email
     if user_in.email:
         user.email = user_in.email
 
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_principal(old_email)
+    invalidate_principal(user.email)
     return user
 
 
@@ -60,6 +86,7 @@ def update_user_password(db: Session, user: models.User, new_password: str) -> m
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.email)
     return user
 
 
@@ -74,12 +101,6 @@ def get_slot_by_number(db: Session, slot_number: str) -> models.Slot | None:
     """
     return db.query(models.Slot).filter(models.Slot.slot_number == slot_number).first()
 
-def get_slots(db: Session, skip: int = 0, limit: int = 100) -> List[models.Slot]:
-    """
-    Reads a list of all slots.
-    """
-    return db.query(models.Slot).offset(skip).limit(limit).all()
-
 def create_slot(db: Session, slot: schemas.SlotCreate) -> models.Slot:
     """
     Creates a new parking slot in the database.
@@ -91,8 +112,12 @@ def create_slot(db: Session, slot: schemas.SlotCreate) -> models.Slot:
         , price_per_hour=slot.price_per_hour
     )
     db.add(db_slot)
+    db.flush()
+    db.add(models.SlotStatusEvent(slot_id=db_slot.id, status=db_slot.status))
     db.commit()
     db.refresh(db_slot)
+    manager.publish_slot(schemas.slot_dict(db_slot))
+    stats.record_slot_status(None, db_slot.status)
     return db_slot
 
 
@@ -102,94 +127,126 @@ def update_slot(db: Session, slot_id: int, slot_data: schemas.SlotUpdate) -> mod
     """
     db_slot = db.query(models.Slot).get(slot_id)
     if db_slot:
+        old_status = db_slot.status
         db_slot.slot_number = slot_data.slot_number
         db_slot.vehicle_type = slot_data.vehicle_type
         db_slot.price_per_hour = slot_data.price_per_hour
         db_slot.status = slot_data.status # Allow admin to manually change status
+        if db_slot.status != old_status:
+            db.add(models.SlotStatusEvent(slot_id=slot_id, status=db_slot.status))
         
         db.add(db_slot)
         db.commit()
         db.refresh(db_slot)
+        manager.publish_slot(schemas.slot_dict(db_slot))
+        stats.record_slot_status(old_status, db_slot.status)
     return db_slot
 
 
-# ----------------------------
-# BOOKING CRUD Functions
-# ----------------------------
-
-def check_slot_availability(db: Session, slot_id: int, start_time: datetime, end_time: datetime) -> bool:
-    """
-    Checks if a slot is available for a given time window.
-    A slot is unavailable if any existing booking overlaps with the requested time.
-    """
-    # Find bookings for this slot that overlap
-    overlapping_bookings = db.query(models.Booking).filter(
-        models.Booking.slot_id == slot_id,
-        models.Booking.status.in_([models.BookingStatus.upcoming, models.BookingStatus.active]),
-        or_(
-            # Case 1: Existing booking starts during new booking
-            and_(models.Booking.start_time >= start_time, models.Booking.start_time < end_time),
-            # Case 2: Existing booking ends during new booking
-            and_(models.Booking.end_time > start_time, models.Booking.end_time <= end_time),
-            # Case 3: Existing booking envelops new booking
-            and_(models.Booking.start_time <= start_time, models.Booking.end_time >= end_time)
-        )
-    ).count()
-
-    return overlapping_bookings == 0
-
-
-# --- 2. UPDATE create_booking ---
-async def create_booking(db: Session, booking: schemas.BookingCreate, user_id: int) -> models.Booking:
-    """
-    Creates a new booking, updates slot to 'reserved', and broadcasts the change.
-    """
-    # Step 1: create booking record
-    db_booking = models.Booking(
-        user_id=user_id,
-        slot_id=booking.slot_id,
-        start_time=booking.start_time,
-        end_time=booking.end_time,
-        vehicle_id=booking.vehicle_id,     # <-- ADD THIS
-        payment_method=booking.payment_method, # <-- ADD THIS
-        status=models.BookingStatus.upcoming
-    )
-    db.add(db_booking)
+def create_slots_bulk(db: Session, bulk: schemas.SlotBulkCreate) -> Tuple[List[models.Slot], List[str]]:
+    """
+    Creates every slot in `bulk.slots` and `bulk.ranges` in one transaction
+    (a single executemany INSERT). Returns (created slots, []) or, if any
+    slot number already exists or repeats, ([], those slot numbers) and
+    creates nothing. Raises ValueError for a bad range.
+    """
+    rows = [slot.dict() for slot in bulk.slots]
+    for slot_range in bulk.ranges:
+        shared = slot_range.dict(exclude={"pattern"})
+        rows.extend({"slot_number": number, **shared} for number in slot_ranges.expand(slot_range.pattern))
+    slot_ranges.check_bulk_size(len(rows))
+    if not rows:
+        return [], []
+
+    numbers = [row["slot_number"] for row in rows]
+    conflicts = {number for number, count in Counter(numbers).items() if count > 1}
+    conflicts.update(db.scalars(select(models.Slot.slot_number).where(models.Slot.slot_number.in_(numbers))))
+    if conflicts:
+        return [], sorted(conflicts)
+
+    db.execute(insert(models.Slot), rows)
+    new_slots = db.execute(
+        select(models.Slot.id, models.Slot.status).where(models.Slot.slot_number.in_(numbers))
+    ).all()
+    db.execute(insert(models.SlotStatusEvent), [{"slot_id": row.id, "status": row.status} for row in new_slots])
     db.commit()
-    db.refresh(db_booking)
-
-    # Step 2: Generate ID and QR code after we have the booking.id
-    booking_id_str = f"SPS-{db_booking.id + 1000}"
-    qr_file_name = f"{booking_id_str}.png"
-    qr_file_path = os.path.join(os.path.dirname(__file__), "..", "static", "qr_codes", qr_file_name)
-    qr_code_url = f"/static/qr_codes/{qr_file_name}"
-
-    qr_img = qrcode.make(booking_id_str)
-    qr_img.save(qr_file_path)
-
-    # Step 3: Update booking and set slot to reserved
-    slot = db_booking.slot
-    slot.status = models.SlotStatus.reserved
-
-    db_booking.booking_id_str = booking_id_str
-    db_booking.qr_code_url = qr_code_url
 
-    db.add(db_booking)
-    db.add(slot)
+    created = db.query(models.Slot).filter(models.Slot.slot_number.in_(numbers)).order_by(models.Slot.id).all()
+    manager.publish_slots([schemas.slot_dict(slot) for slot in created])
+    stats.record_slot_statuses((None, slot.status) for slot in created)
+    return created, []
+
+
+def update_slots_bulk(db: Session, bulk: schemas.SlotBulkUpdate) -> Tuple[List[models.Slot], List[str]]:
+    """
+    Applies each change to every slot its pattern matches (later changes
+    win) in one transaction (a single executemany UPDATE by id). Returns
+    (updated slots, []) or, if any matched slot number does not exist,
+    ([], those slot numbers) and updates nothing. Raises ValueError for a
+    bad range.
+    """
+    values_by_number = {}
+    for change in bulk.changes:
+        values = change.dict(exclude={"pattern"}, exclude_none=True)
+        for number in slot_ranges.expand(change.pattern):
+            values_by_number.setdefault(number, {}).update(values)
+    slot_ranges.check_bulk_size(len(values_by_number))
+
+    current = db.execute(
+        select(models.Slot.id, models.Slot.slot_number, models.Slot.status)
+        .where(models.Slot.slot_number.in_(list(values_by_number)))
+    ).all()
+    missing = set(values_by_number) - {row.slot_number for row in current}
+    if missing:
+        return [], sorted(missing)
+
+    mappings = [{"id": row.id, **values_by_number[row.slot_number]} for row in current]
+    mappings = [mapping for mapping in mappings if len(mapping) > 1]
+    if mappings:
+        db.execute(update(models.Slot), mappings)
+    events = [
+        {"slot_id": row.id, "status": values_by_number[row.slot_number]["status"]}
+        for row in current
+        if values_by_number[row.slot_number].get("status", row.status) != row.status
+    ]
+    if events:
+        db.execute(insert(models.SlotStatusEvent), events)
     db.commit()
-    db.refresh(db_booking)
-    db.refresh(slot)
 
-    # Step 4: Broadcast the change
-    await manager.broadcast_json({"type": "slot_update", "slot": schemas.Slot.from_orm(slot).dict()})
+    ids = [row.id for row in current]
+    updated = db.query(models.Slot).filter(models.Slot.id.in_(ids)).order_by(models.Slot.id).all()
+    manager.publish_slots([schemas.slot_dict(slot) for slot in updated])
+    old_status = {row.id: row.status for row in current}
+    stats.record_slot_statuses((old_status[slot.id], slot.status) for slot in updated)
+    return updated, []
 
-    return db_booking
 
-def get_bookings_by_user(db: Session, user_id: int) -> List[models.Booking]:
-    """
-    Gets all bookings for a specific user.
-    """
-    return db.query(models.Booking).filter(models.Booking.user_id == user_id).order_by(models.Booking.start_time.desc()).all()
+# ----------------------------
+# BOOKING CRUD Functions
+# ----------------------------
+
+def get_bookings_by_user(
+    db: Session,
+    user_id: int,
+    page: PageParams,
+    status: Optional[models.BookingStatus] = None,
+    slot_id: Optional[int] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None
+) -> Tuple[List[models.Booking], Optional[str]]:
+    """
+    Gets a page of bookings for a specific user, newest start time first.
+    """
+    query = db.query(models.Booking).options(*BOOKING_LIST_OPTIONS).filter(models.Booking.user_id == user_id)
+    if status is not None:
+        query = query.filter(models.Booking.status == status)
+    if slot_id is not None:
+        query = query.filter(models.Booking.slot_id == slot_id)
+    if start_from is not None:
+        query = query.filter(models.Booking.start_time >= start_from)
+    if start_to is not None:
+        query = query.filter(models.Booking.start_time < start_to)
+    return paginate(query, [models.Booking.start_time, models.Booking.id], page, descending=True)
 
 
 # --- ADD THESE NEW FUNCTIONS ---
@@ -200,50 +257,6 @@ def get_booking_by_id_str(db: Session, booking_id_str: str) -> models.Booking |
     """
     return db.query(models.Booking).filter(models.Booking.booking_id_str == booking_id_str).first()
 
-# --- 5. UPDATE check_in_booking ---
-async def check_in_booking(db: Session, booking: models.Booking) -> models.Booking:
-    """
-    Marks a booking as 'active', updates slot to 'booked' (occupied), and broadcasts.
-    """
-    slot = booking.slot
-
-    booking.status = models.BookingStatus.active
-    booking.check_in_time = datetime.utcnow()
-
-    slot.status = models.SlotStatus.booked
-
-    db.add(booking)
-    db.add(slot)
-    db.commit()
-    db.refresh(booking)
-    db.refresh(slot)
-
-    await manager.broadcast_json({"type": "slot_update", "slot": schemas.Slot.from_orm(slot).dict()})
-
-    return booking
-
-# --- 6. UPDATE check_out_booking ---
-async def check_out_booking(db: Session, booking: models.Booking) -> models.Booking:
-    """
-    Marks a booking as 'completed', frees slot to 'available', and broadcasts.
-    """
-    slot = booking.slot
-
-    booking.status = models.BookingStatus.completed
-    booking.check_out_time = datetime.utcnow()
-
-    slot.status = models.SlotStatus.available
-
-    db.add(booking)
-    db.add(slot)
-    db.commit()
-    db.refresh(booking)
-    db.refresh(slot)
-
-    await manager.broadcast_json({"type": "slot_update", "slot": schemas.Slot.from_orm(slot).dict()})
-
-    return booking
-
 def delete_slot(db: Session, slot_id: int) -> models.Slot | None:
     """
     Deletes a slot from the database.
@@ -251,34 +264,14 @@ def delete_slot(db: Session, slot_id: int) -> models.Slot | None:
     db_slot = db.query(models.Slot).get(slot_id)
     if db_slot:
         db.delete(db_slot)
+        db.add(models.SlotStatusEvent(slot_id=slot_id, status=None))
         db.commit()
+        publish_remove_slot(slot_id)
+        manager.publish_slot({"id": slot_id, "deleted": True})
+        stats.record_slot_status(db_slot.status, None)
         return db_slot
     return None
 
-# --- STATISTICS ---
-def get_admin_stats(db: Session):
-    total_slots = db.query(func.count(models.Slot.id)).scalar()
-
-    available_slots = db.query(func.count(models.Slot.id)).filter(
-        models.Slot.status == models.SlotStatus.available
-    ).scalar()
-
-    booked_slots = db.query(func.count(models.Slot.id)).filter(
-        models.Slot.status.in_([models.SlotStatus.booked, models.SlotStatus.reserved])
-    ).scalar()
-
-    total_users = db.query(func.count(models.User.id)).scalar()
-
-    total_bookings = db.query(func.count(models.Booking.id)).scalar()
-
-    return {
-        "total_slots": total_slots,
-        "available_slots": available_slots,
-        "booked_slots": booked_slots,
-        "total_users": total_users,
-        "total_bookings": total_bookings
-    }
-
 # ----------------------------
 # VEHICLE CRUD Functions
 # ----------------------------
@@ -289,11 +282,12 @@ def get_vehicle_by_plate(db: Session, license_plate: str) -> models.Vehicle | No
     """
     return db.query(models.Vehicle).filter(models.Vehicle.license_plate == license_plate).first()
 
-def get_vehicles_by_user(db: Session, user_id: int) -> List[models.Vehicle]:
+def get_vehicles_by_user(db: Session, user_id: int, page: PageParams) -> Tuple[List[models.Vehicle], Optional[str]]:
     """
-    Gets all vehicles for a specific user.
+    Gets a page of vehicles for a specific user.
     """
-    return db.query(models.Vehicle).filter(models.Vehicle.owner_id == user_id).all()
+    query = db.query(models.Vehicle).filter(models.Vehicle.owner_id == user_id)
+    return paginate(query, [models.Vehicle.id], page)
 
 def create_user_vehicle(db: Session, vehicle: schemas.VehicleCreate, user_id: int) -> models.Vehicle:
     """
@@ -359,33 +353,53 @@ def update_payment_record(db: Session, order_id: str, payment_id: str, status: s
         return True
     return False
 
-def get_payments_by_user(db: Session, user_id: int) -> List[models.Payment]:
+def get_payments_by_user(
+    db: Session,
+    user_id: int,
+    page: PageParams,
+    status: Optional[models.PaymentStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Tuple[List[models.Payment], Optional[str]]:
     """
-    Gets all payments for a specific user.
+    Gets a page of payments for a specific user, newest first.
     """
-    return db.query(models.Payment).join(models.Booking).filter(
+    query = db.query(models.Payment).options(*PAYMENT_LIST_OPTIONS).join(models.Booking).filter(
         models.Booking.user_id == user_id
-    ).order_by(models.Payment.created_at.desc()).all()
+    )
+    if status is not None:
+        query = query.filter(models.Payment.status == status)
+    if created_from is not None:
+        query = query.filter(models.Payment.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(models.Payment.created_at < created_to)
+    return paginate(query, [models.Payment.created_at, models.Payment.id], page, descending=True)
 
 # ----------------------------
 # GATE LOG CRUD Functions
 # ----------------------------
 
-def create_gate_log(db: Session, staff_id: int, booking: models.Booking, action: str):
-    """
-    Creates a new entry in the gate log.
-    """
-    log_entry = models.GateLog(
-        staff_id=staff_id,
-        booking_id=booking.id,
-        action=action,
-        vehicle_plate=booking.vehicle.license_plate # Get plate from vehicle
-    )
-    db.add(log_entry)
-    db.commit()
-
-def get_gate_logs(db: Session) -> List[models.GateLog]:
-    """
-    Gets all gate logs, newest first.
-    """
-    return db.query(models.GateLog).order_by(models.GateLog.timestamp.desc()).all()
\ No newline at end of file
+def get_gate_logs(
+    db: Session,
+    page: PageParams,
+    staff_id: Optional[int] = None,
+    action: Optional[str] = None,
+    slot_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> Tuple[List[models.GateLog], Optional[str]]:
+    """
+    Gets a page of gate logs, newest first.
+    """
+    query = db.query(models.GateLog).options(*GATE_LOG_LIST_OPTIONS)
+    if staff_id is not None:
+        query = query.filter(models.GateLog.staff_id == staff_id)
+    if action is not None:
+        query = query.filter(models.GateLog.action == action)
+    if slot_id is not None:
+        query = query.join(models.Booking).filter(models.Booking.slot_id == slot_id)
+    if date_from is not None:
+        query = query.filter(models.GateLog.timestamp >= date_from)
+    if date_to is not None:
+        query = query.filter(models.GateLog.timestamp < date_to)
+    return paginate(query, [models.GateLog.timestamp, models.GateLog.id], page, descending=True)
\ No newline at end of file
@@ -0,0 +1,403 @@
+# backend/app/crud_async.py
+#
+# Async versions of the crud functions used by async routes.
+# They take an AsyncSession (database.get_async_db) so DB IO does not
+# block the event loop that also serves /ws/slots.
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import models, schemas
+from .websocket_manager import manager
+from .booking_index import booking_index, naive_utc, publish_add, publish_discard
+from .qr_generator import qr_code_url
+from .security import invalidate_principal
+from . import stats
+
+# Everything schemas.Booking needs, loaded up front in the same query
+# (no lazy loads in async). Full objects: the gate flows update the slot.
+BOOKING_LOAD_OPTIONS = (
+    joinedload(models.Booking.user),
+    joinedload(models.Booking.slot),
+    joinedload(models.Booking.vehicle),
+)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> models.User | None:
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str) -> models.User:
+    """
+    Creates a user from an already computed password hash
+    (security.get_password_hash_async).
+    """
+    db_user = models.User(email=user.email, hashed_password=hashed_password, role=user.role)
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    stats.record_change(users=1)
+    return db_user
+
+
+async def update_user_password_hash(db: AsyncSession, user: models.User, hashed_password: str) -> models.User:
+    user.hashed_password = hashed_password
+    await db.commit()
+    invalidate_principal(user.email)
+    return user
+
+
+async def get_booking(db: AsyncSession, booking_id: int) -> models.Booking | None:
+    """
+    Gets a single booking with its user, slot and vehicle loaded.
+    """
+    result = await db.execute(
+        select(models.Booking)
+        .options(*BOOKING_LOAD_OPTIONS)
+        .where(models.Booking.id == booking_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def get_booking_by_id_str(db: AsyncSession, booking_id_str: str) -> models.Booking | None:
+    """
+    Gets a single booking by its human-readable ID (e.g., "SPS-1002").
+    """
+    result = await db.execute(
+        select(models.Booking)
+        .options(*BOOKING_LOAD_OPTIONS)
+        .where(models.Booking.booking_id_str == booking_id_str)
+    )
+    return result.scalars().first()
+
+
+async def check_slot_availability(db: AsyncSession, slot_id: int, start_time: datetime, end_time: datetime) -> bool:
+    """
+    Checks if a slot is available for a given time window: no upcoming or
+    active booking of the slot overlaps it.
+    """
+    result = await db.execute(
+        select(func.count(models.Booking.id)).where(
+            models.Booking.slot_id == slot_id,
+            models.Booking.status.in_([models.BookingStatus.upcoming, models.BookingStatus.active]),
+            or_(
+                and_(models.Booking.start_time >= start_time, models.Booking.start_time < end_time),
+                and_(models.Booking.end_time > start_time, models.Booking.end_time <= end_time),
+                and_(models.Booking.start_time <= start_time, models.Booking.end_time >= end_time)
+            )
+        )
+    )
+    return result.scalar_one() == 0
+
+
+async def rank_free_slots(db: AsyncSession, vehicle_type: str, start_time: datetime, end_time: datetime) -> List[models.Slot]:
+    """
+    Returns the slots of a vehicle type that are free for the time window,
+    best candidate first.
+
+    Best-fit packing: a slot whose free gap around the window is the
+    tightest wins, so long free stretches stay open for long bookings.
+    Gaps come from the in-memory booking index, so this is one slot query
+    and no per-slot booking queries.
+    """
+    start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+    result = await db.execute(
+        select(models.Slot).where(
+            models.Slot.vehicle_type == vehicle_type,
+            models.Slot.status != models.SlotStatus.maintenance
+        )
+    )
+
+    ranked = []
+    for slot in result.scalars():
+        gap = booking_index.find_gap(slot.id, start_time, end_time)
+        if gap is None:
+            continue
+        prev_end, next_start = gap
+        # Unbounded sides are the worst fit; then the least left-over time
+        open_sides = (prev_end is None) + (next_start is None)
+        leftover = 0.0
+        if prev_end is not None:
+            leftover += (start_time - prev_end).total_seconds()
+        if next_start is not None:
+            leftover += (next_start - end_time).total_seconds()
+        ranked.append(((open_sides, leftover, slot.slot_number), slot))
+
+    ranked.sort(key=lambda item: item[0])
+    return [slot for _, slot in ranked]
+
+
+class KeyedLocks:
+    """
+    One asyncio lock per key (e.g. slot id), created on demand and
+    dropped again once nobody holds or waits for it.
+    """
+
+    def __init__(self):
+        self._locks: Dict[int, list] = {}  # key -> [lock, holders and waiters]
+
+    @asynccontextmanager
+    async def hold(self, key: int):
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+slot_locks = KeyedLocks()
+
+
+async def create_booking(db: AsyncSession, booking: schemas.BookingCreate, user_id: int) -> models.Booking | None:
+    """
+    Creates a new booking, updates slot to 'reserved', and broadcasts the change.
+    Returns None (nothing written) if the slot is taken for that time or
+    does not exist.
+
+    Bookings of the same slot are serialized, other slots are not: in this
+    worker by an asyncio lock per slot, across workers by the row lock the
+    first statement takes (bumping Slot.version). The overlap check runs
+    under that lock, so two requests can never both pass it. Call this at
+    the start of a transaction (no earlier reads on `db`), so the check
+    sees every booking committed before the lock was taken.
+    """
+    start_time, end_time = naive_utc(booking.start_time), naive_utc(booking.end_time)
+    async with slot_locks.hold(booking.slot_id):
+        # Step 1: lock the slot row until commit/rollback
+        result = await db.execute(
+            update(models.Slot)
+            .where(models.Slot.id == booking.slot_id)
+            .values(version=models.Slot.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1 or not await check_slot_availability(
+            db, booking.slot_id, start_time, end_time
+        ):
+            await db.rollback()
+            return None
+
+        # Step 2: create booking record (flush to get the id)
+        db_booking = models.Booking(
+            user_id=user_id,
+            slot_id=booking.slot_id,
+            start_time=start_time,
+            end_time=end_time,
+            vehicle_id=booking.vehicle_id,
+            payment_method=booking.payment_method,
+            status=models.BookingStatus.upcoming
+        )
+        db.add(db_booking)
+        await db.flush()
+
+        # Step 3: Generate ID now that we have the booking.id
+        # (the QR image is rendered on demand by GET /bookings/qr/{booking_id_str})
+        booking_id_str = f"SPS-{db_booking.id + 1000}"
+
+        # Step 4: Update booking and set slot to reserved, one commit
+        slot = await db.get(models.Slot, booking.slot_id)
+        old_status = slot.status
+        slot.status = models.SlotStatus.reserved
+        if old_status != slot.status:
+            db.add(models.SlotStatusEvent(slot_id=slot.id, status=slot.status))
+
+        db_booking.booking_id_str = booking_id_str
+        db_booking.qr_code_url = qr_code_url(booking_id_str)
+        await db.commit()
+
+    publish_add(db_booking.slot_id, db_booking.start_time, db_booking.end_time, db_booking.id)
+
+    # Step 5: Broadcast the change
+    manager.publish_slot(schemas.slot_dict(slot))
+    stats.record_change(bookings=1)
+    stats.record_slot_status(old_status, slot.status)
+
+    return await get_booking(db, db_booking.id)
+
+
+# Gate transitions: action -> (booking status before, after, slot status after)
+GATE_TRANSITIONS = {
+    "check-in": (models.BookingStatus.upcoming, models.BookingStatus.active, models.SlotStatus.booked),
+    "check-out": (models.BookingStatus.active, models.BookingStatus.completed, models.SlotStatus.available),
+}
+
+
+async def _apply_gate_transition(
+    db: AsyncSession,
+    booking: models.Booking,
+    staff_id: int,
+    action: str,
+    timestamp: datetime | None = None
+) -> models.SlotStatus | None:
+    """
+    The state change of one gate scan, without committing: a
+    status-guarded UPDATE of the booking, then the slot status and a new
+    gate log entry (flushed with the commit). Returns the slot's previous
+    status, or None (nothing changed) if the booking was no longer in the
+    expected status. The booking must be loaded with its slot and vehicle.
+    """
+    from_status, to_status, slot_status = GATE_TRANSITIONS[action]
+
+    result = await db.execute(
+        update(models.Booking)
+        .where(models.Booking.id == booking.id, models.Booking.status == from_status)
+        .values(status=to_status)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return None
+    set_committed_value(booking, "status", to_status)
+
+    slot = booking.slot
+    old_slot_status = slot.status
+    slot.status = slot_status
+    if old_slot_status != slot_status:
+        db.add(models.SlotStatusEvent(slot_id=slot.id, status=slot_status, changed_at=timestamp or datetime.utcnow()))
+    log_entry = models.GateLog(
+        staff_id=staff_id,
+        booking_id=booking.id,
+        action=action,
+        vehicle_plate=booking.vehicle.license_plate
+    )
+    if timestamp is not None:
+        log_entry.timestamp = timestamp
+    db.add(log_entry)
+    return old_slot_status
+
+
+def _after_gate_commit(changes: List[tuple]):
+    """
+    Index, broadcast and counters for committed gate changes, given as
+    (booking, action, old slot status) in the order they were applied.
+    """
+    slots = {}
+    for booking, action, old_slot_status in changes:
+        if action == "check-out":
+            publish_discard(booking.slot_id, booking.id)
+        stats.record_slot_status(old_slot_status, GATE_TRANSITIONS[action][2])
+        slots[booking.slot.id] = booking.slot
+    manager.publish_slots(schemas.slot_dict(slot) for slot in slots.values())
+
+
+async def gate_transition(db: AsyncSession, booking: models.Booking, staff_id: int, action: str) -> models.Booking | None:
+    """
+    Checks a booking in or out in one transaction: a status-guarded UPDATE
+    of the booking, the slot status and the gate log entry, one commit.
+    Returns None (and changes nothing) if the booking was no longer in the
+    expected status, e.g. the same ticket scanned at two gates at once.
+    The booking must be loaded with its slot and vehicle (see get_booking_by_id_str).
+    """
+    old_slot_status = await _apply_gate_transition(db, booking, staff_id, action)
+    if old_slot_status is None:
+        await db.rollback()
+        return None
+    await db.commit()
+    _after_gate_commit([(booking, action, old_slot_status)])
+    return booking
+
+
+async def check_in_booking(db: AsyncSession, booking: models.Booking, staff_id: int) -> models.Booking | None:
+    """
+    Marks a booking as 'active', updates slot to 'booked' (occupied), logs it and broadcasts.
+    """
+    return await gate_transition(db, booking, staff_id, "check-in")
+
+
+async def check_out_booking(db: AsyncSession, booking: models.Booking, staff_id: int) -> models.Booking | None:
+    """
+    Marks a booking as 'completed', frees slot to 'available', logs it and broadcasts.
+    """
+    return await gate_transition(db, booking, staff_id, "check-out")
+
+
+async def _apply_gate_events(db: AsyncSession, events: List[schemas.GateEvent], staff_id: int):
+    result = await db.execute(
+        select(models.GateEvent)
+        .where(models.GateEvent.client_event_id.in_({e.client_event_id for e in events}))
+    )
+    processed = {row.client_event_id: row for row in result.scalars()}
+    result = await db.execute(
+        select(models.Booking)
+        .options(*BOOKING_LOAD_OPTIONS)
+        .where(models.Booking.booking_id_str.in_({e.booking_id_str for e in events}))
+        .execution_options(populate_existing=True)
+    )
+    bookings = {booking.booking_id_str: booking for booking in result.scalars()}
+
+    results, changes = [], []
+    for event in events:
+        original = processed.get(event.client_event_id)
+        if original is not None:
+            detail = f"Already {original.result}" + (f": {original.detail}" if original.detail else "")
+            results.append(schemas.GateEventResult(
+                client_event_id=event.client_event_id, result="duplicate", detail=detail
+            ))
+            continue
+
+        booking = bookings.get(event.booking_id_str)
+        from_status = GATE_TRANSITIONS[event.action][0]
+        old_slot_status = None
+        if booking is None:
+            detail = "Booking ID not found"
+        elif booking.status != from_status:
+            detail = f"Booking is not '{from_status.value}'"
+        else:
+            old_slot_status = await _apply_gate_transition(
+                db, booking, staff_id, event.action, timestamp=naive_utc(event.client_timestamp)
+            )
+            detail = None if old_slot_status is not None else f"Booking is not '{from_status.value}'"
+
+        record = models.GateEvent(
+            client_event_id=event.client_event_id,
+            staff_id=staff_id,
+            booking_id_str=event.booking_id_str,
+            action=event.action,
+            result="rejected" if detail else "applied",
+            detail=detail
+        )
+        db.add(record)
+        processed[event.client_event_id] = record
+
+        if old_slot_status is not None:
+            changes.append((booking, event.action, old_slot_status))
+        results.append(schemas.GateEventResult(
+            client_event_id=event.client_event_id,
+            result=record.result,
+            detail=detail,
+            booking_status=booking.status if booking is not None else None
+        ))
+    return results, changes
+
+
+async def apply_gate_events(db: AsyncSession, events: List[schemas.GateEvent], staff_id: int) -> List[schemas.GateEventResult]:
+    """
+    Applies a batch of gate scans in order, in one transaction, with the
+    same state transitions as single check-ins/outs. Each event gets its
+    own result, and its outcome is stored (models.GateEvent): an event id
+    seen before is reported as a duplicate and skipped, so batches can be
+    replayed.
+    """
+    try:
+        results, changes = await _apply_gate_events(db, events, staff_id)
+        await db.commit()
+    except IntegrityError:
+        # A concurrent replay committed some of the same event ids first;
+        # run the batch again, those events now show up as duplicates
+        await db.rollback()
+        results, changes = await _apply_gate_events(db, events, staff_id)
+        await db.commit()
+    _after_gate_commit(changes)
+    return results
@@ -1,12 +1,51 @@
 # backend/app/database.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from .core.config import settings
+from .db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
-engine = create_engine(settings.DATABASE_URL)
+def pool_options(url: str, poolclass) -> dict:
+    """
+    Pool settings for create_engine. In-memory SQLite keeps SQLAlchemy's
+    default single-connection pool (a queue pool would give each
+    connection its own empty database).
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def use_sqlite_wal(engine, url: str):
+    """
+    WAL journal and synchronous=NORMAL on every connection of a file
+    SQLite database (settings.SQLITE_WAL). Readers then no longer block
+    the writer, and a commit is not an fsync.
+    """
+    parsed = make_url(url)
+    if not settings.SQLITE_WAL or parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL, InstrumentedQueuePool))
+use_sqlite_wal(engine, settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -15,4 +54,37 @@ def get_db() -> Generator:
         db = SessionLocal()
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# --- ASYNC ENGINE (used by the async routes) ---
+# Sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url() -> str:
+    """
+    Uses ASYNC_DATABASE_URL if set, otherwise derives the async URL
+    from DATABASE_URL (e.g. mysql+pymysql -> mysql+aiomysql).
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+async_engine = create_async_engine(
+    get_async_database_url(),
+    **pool_options(get_async_database_url(), InstrumentedAsyncQueuePool)
+)
+use_sqlite_wal(async_engine.sync_engine, get_async_database_url())
+# expire_on_commit=False: objects stay readable after commit without lazy IO
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,100 @@
+# backend/app/db_pool.py
+#
+# Connection pools that count what happens at checkout, so the pool can
+# be sized for the number of workers (see GET /admin/db-pool).
+
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last one is open
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolStatsMixin:
+    """
+    Records, per pool: how long each checkout waited for a connection
+    (histogram), how often a connection beyond pool_size had to be opened
+    (overflow) and how often a checkout gave up (pool timeout).
+
+    Only public pool API is used: connect() is timed, and the "checkout"
+    and "connect" pool events count checkouts and new connections.
+    """
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+        self._stats_lock = threading.Lock()
+        self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._checkouts = 0
+        self._overflow_events = 0
+        self._timeouts = 0
+        event.listen(self, "checkout", self._on_checkout)
+        event.listen(self, "connect", self._on_connect)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            self._record_wait((time.perf_counter() - started) * 1000)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._stats_lock:
+            self._checkouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        # A new connection while more than pool_size are open is an overflow one
+        if self.overflow() > 0:
+            with self._stats_lock:
+                self._overflow_events += 1
+
+    def _record_wait(self, wait_ms: float):
+        with self._stats_lock:
+            self._wait_counts[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self._wait_total_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            waits = sum(self._wait_counts)
+            labels = [f"<={bound}" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}"]
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self.max_overflow,
+                "checked_out": self.checkedout(),
+                "idle": self.checkedin(),
+                "overflow": max(0, self.overflow()),
+                "checkouts": self._checkouts,
+                "overflow_events": self._overflow_events,
+                "timeouts": self._timeouts,
+                "wait_ms": {
+                    "histogram": dict(zip(labels, self._wait_counts)),
+                    "avg": round(self._wait_total_ms / waits, 3) if waits else 0.0,
+                    "max": round(self._wait_max_ms, 3),
+                },
+            }
+
+
+class InstrumentedQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(pool) -> dict:
+    """Stats of any pool; pools without instrumentation only report status()."""
+    if isinstance(pool, PoolStatsMixin):
+        return pool.stats()
+    return {"status": pool.status()}
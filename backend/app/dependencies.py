@@ -1,10 +1,21 @@
 # backend/app/api/dependencies.py
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from . import crud, models 
 from .database import get_db
-from .security import oauth2_scheme, decode_token
+from .security import oauth2_scheme, decode_token, principal_cache
+
+def _detached_copy(user: models.User) -> models.User:
+    """
+    A session-free copy of a user for the principal cache. Every request
+    merges it into its own session, so the cached object is never shared.
+    """
+    columns = {attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs}
+    copy = models.User(**columns)
+    make_transient_to_detached(copy)
+    return copy
 
 def get_current_user(
     token: str = Depends(oauth2_scheme), 
@@ -19,9 +30,14 @@ def get_current_user(
     token_data = decode_token(token)
     if token_data is None or token_data.email is None:
         raise credentials_exception
+    cached = principal_cache.get(token_data.email)
+    if cached is not None:
+        # Attach to this request's session without a query
+        return db.merge(cached, load=False)
     user = crud.get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    principal_cache.set(token_data.email, _detached_copy(user))
     return user
 
 # --- ADD THIS NEW FUNCTION ---
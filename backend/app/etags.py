@@ -0,0 +1,37 @@
+# backend/app/etags.py
+#
+# Conditional GET for responses served from in-memory state (the slot
+# board, the dashboard counters). The ETag is the version of that state,
+# so a client that already has the current version gets a 304 before any
+# body is built.
+
+import uuid
+
+from fastapi import Request, Response, status
+
+# Versions count from process start, so the same number can mean different
+# data on another worker or after a restart
+_PROCESS_TAG = uuid.uuid4().hex[:12]
+
+# Clients may reuse the body but must revalidate it every time
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(name: str, version: int) -> str:
+    return f'"{name}-{_PROCESS_TAG}-{version}"'
+
+
+def is_fresh(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
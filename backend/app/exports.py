@@ -0,0 +1,157 @@
+# backend/app/exports.py
+#
+# Full-history exports (CSV or NDJSON, optionally gzipped) for the admin
+# export routes. Rows are read as plain tuples with a server-side cursor
+# (yield_per) and written out in small chunks, so memory stays flat no
+# matter how big the table is.
+
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from . import models
+from .database import SessionLocal
+
+FETCH_SIZE = 1000  # rows per DB round trip and per output chunk
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+Staff = aliased(models.User)
+
+
+def _gate_logs_query():
+    return select(
+        models.GateLog.id,
+        models.GateLog.timestamp,
+        models.GateLog.action,
+        models.GateLog.vehicle_plate,
+        models.GateLog.staff_id,
+        Staff.email.label("staff_email"),
+        models.GateLog.booking_id,
+        models.Booking.booking_id_str,
+    ).outerjoin(Staff, models.GateLog.staff_id == Staff.id) \
+     .outerjoin(models.Booking, models.GateLog.booking_id == models.Booking.id)
+
+
+def _bookings_query():
+    return select(
+        models.Booking.id,
+        models.Booking.booking_id_str,
+        models.Booking.user_id,
+        models.User.email.label("user_email"),
+        models.Booking.slot_id,
+        models.Slot.slot_number,
+        models.Vehicle.license_plate,
+        models.Booking.start_time,
+        models.Booking.end_time,
+        models.Booking.status,
+        models.Booking.payment_method,
+    ).outerjoin(models.User, models.Booking.user_id == models.User.id) \
+     .outerjoin(models.Slot, models.Booking.slot_id == models.Slot.id) \
+     .outerjoin(models.Vehicle, models.Booking.vehicle_id == models.Vehicle.id)
+
+
+def _payments_query():
+    return select(
+        models.Payment.id,
+        models.Payment.booking_id,
+        models.Booking.booking_id_str,
+        models.User.email.label("user_email"),
+        models.Payment.amount,
+        models.Payment.status,
+        models.Payment.payment_method,
+        models.Payment.provider_transaction_id,
+        models.Payment.created_at,
+        models.Payment.updated_at,
+    ).outerjoin(models.Booking, models.Payment.booking_id == models.Booking.id) \
+     .outerjoin(models.User, models.Booking.user_id == models.User.id)
+
+
+# dataset -> (query builder, id column, time column used by the date filters)
+DATASETS = {
+    "gate-logs": (_gate_logs_query, models.GateLog.id, models.GateLog.timestamp),
+    "bookings": (_bookings_query, models.Booking.id, models.Booking.start_time),
+    "payments": (_payments_query, models.Payment.id, models.Payment.created_at),
+}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _csv_chunks(columns, batches) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns, batches) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(
+    dataset: str,
+    fmt: str,
+    gzip: bool = False,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> Iterator[bytes]:
+    """
+    Yields the whole dataset (optionally one date range, `date_to`
+    exclusive) in id order. Opens its own session because it runs after
+    the route has returned.
+    """
+    build_query, id_column, time_column = DATASETS[dataset]
+    query = build_query()
+    if date_from is not None:
+        query = query.where(time_column >= date_from)
+    if date_to is not None:
+        query = query.where(time_column < date_to)
+    query = query.order_by(id_column).execution_options(yield_per=FETCH_SIZE)
+
+    def chunks() -> Iterator[bytes]:
+        db = SessionLocal()
+        try:
+            result = db.execute(query)
+            columns = list(result.keys())
+            to_text = _csv_chunks if fmt == "csv" else _ndjson_chunks
+            for text in to_text(columns, result.partitions()):
+                yield text.encode("utf-8")
+        finally:
+            db.close()
+
+    return _gzip(chunks()) if gzip else chunks()
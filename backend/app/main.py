@@ -3,31 +3,83 @@
 # --- 1. IMPORT STATICFILES ---
 from fastapi.staticfiles import StaticFiles
 import os # Import os to handle file paths
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .database import engine, SessionLocal, AsyncSessionLocal, async_engine
+from typing import Optional
 from . import models
 from .core.config import settings
 from .api import auth, slots, bookings, gate, admin, users, payments
 from .websocket_manager import manager # <-- 1. Import the manager
+from .booking_index import booking_index
+from .slot_board import slot_board
+from .pdf_generator import shutdown_render_pool
+from .security import decode_token, principal_cache
+from .pagination import NEXT_CURSOR_HEADER
+from .migrations import run_migrations
+from . import stats, occupancy
 
 # --- 2. DEFINE STATIC PATH ---
 # Create the directory if it doesn't exist
-static_qr_dir = os.path.join(os.path.dirname(__file__), "..", "static", "qr_codes")
-os.makedirs(static_qr_dir, exist_ok=True)
+# (QR codes are rendered on demand now; old /static/qr_codes files still resolve)
+static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
+os.makedirs(static_dir, exist_ok=True)
 
 
 # --- Create Database Tables ---
-# This line tells SQLAlchemy to create all tables
-# based on your models.py
-Base.metadata.create_all(bind=engine)
+# Creates all tables based on your models.py, then brings existing tables
+# up to date (new indexes/columns); one worker at a time, see migrations.py
+run_migrations(engine)
+
+# --- Startup / Shutdown ---
+async def reconcile_stats_periodically():
+    # Bounds any drift of the live dashboard counters
+    while True:
+        await asyncio.sleep(settings.STATS_RECONCILE_SECONDS)
+        await run_in_threadpool(stats.reconcile_from_db)
+
+async def resync_from_db():
+    # Bus messages other workers sent while this one had no hub link never
+    # arrived: reload what is kept from them, and catch up our dashboards
+    await booking_index.resync()
+    manager.queue_local_slots(await slot_board.resync())
+
+manager.on_link(resync_from_db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the in-memory booking index and slot board
+    db = SessionLocal()
+    try:
+        booking_index.rebuild(db)
+        slot_board.rebuild(db)
+    finally:
+        db.close()
+    await manager.start()
+    await run_in_threadpool(stats.reconcile_from_db)
+    reconcile_task = asyncio.create_task(reconcile_stats_periodically())
+    # Load the slot status history for the occupancy analytics in the background
+    asyncio.create_task(run_in_threadpool(occupancy.refresh_from_db))
+    yield
+    reconcile_task.cancel()
+    await manager.stop()
+    shutdown_render_pool()
+    await async_engine.dispose()
 
 # --- Initialize FastAPI App ---
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    description="Backend API for the Smart Parking System project."
+    description="Backend API for the Smart Parking System project.",
+    lifespan=lifespan,
+    # orjson instead of the stdlib encoder for every JSON response
+    default_response_class=ORJSONResponse
 )
 
 # --- CORS Middleware ---
@@ -38,17 +90,56 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
     )
 
 # --- 2. ADD THE WEBSOCKET ENDPOINT ---
+async def load_slot_snapshot():
+    return slot_board.slots()
+
 @app.websocket("/ws/slots")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, since: Optional[int] = None, epoch: Optional[str] = None):
+    """
+    Live slot board. Sends a snapshot on connect (or only the missed deltas
+    when reconnecting with ?since=<version>&epoch=<epoch>), then deltas.
+    """
     try:
+        await manager.connect(websocket, since=since, epoch=epoch, load_snapshot=load_slot_snapshot)
         while True:
             # Keep the connection alive
             await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
+
+async def is_admin_token(token: str) -> bool:
+    token_data = decode_token(token)
+    if token_data is None or token_data.email is None:
+        return False
+    user = principal_cache.get(token_data.email)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(models.User).where(models.User.email == token_data.email))
+            user = result.scalars().first()
+    return user is not None and user.role == models.UserRole.admin
+
+@app.websocket("/ws/stats")
+async def stats_websocket_endpoint(websocket: WebSocket, token: str = ""):
+    """
+    Live admin dashboard counters (?token=<admin access token>).
+    Sends the current stats on connect, then every change.
+    """
+    if not await is_admin_token(token):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        await manager.connect_stats(websocket)
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 # --- API Routers ---
@@ -77,7 +168,7 @@ app.include_router(
 # This must be mounted *before* the routers
 app.mount(
     "/static", 
-    StaticFiles(directory=os.path.join(os.path.dirname(__file__), "..", "static")), 
+    StaticFiles(directory=static_dir), 
     name="static"
 )
 
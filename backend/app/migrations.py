@@ -0,0 +1,153 @@
+# backend/app/migrations.py
+#
+# Versioned schema changes for existing databases.
+#
+# Base.metadata.create_all only creates missing tables, so anything added
+# to an existing table later (indexes, columns) goes here as a numbered
+# migration. The `schema_version` table records which ones have run;
+# run_migrations() applies the rest in order at startup, each in its own
+# transaction. Migrations must be safe on a fresh database too, where
+# create_all already built the current schema.
+#
+# Every uvicorn worker runs this at startup, so it holds a lock meanwhile
+# (MySQL GET_LOCK, or an flock file next to a SQLite database) and reads
+# the version only once it has it: the first worker migrates, the others
+# wait, then find nothing left to do.
+
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, exists, func, inspect, literal, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from . import models  # noqa: F401  (registers the tables on Base)
+from .database import Base
+
+LOCK_NAME = "smart_parking_schema_migrations"
+LOCK_TIMEOUT_SECONDS = 300
+
+version_metadata = MetaData()
+schema_version = Table(
+    "schema_version", version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+def _model_index(name: str):
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise KeyError(f"No index named {name!r} in models.py")
+
+
+def create_indexes(*names: str) -> Callable[[Connection], None]:
+    """A migration that creates indexes declared in models.py, if missing."""
+    def migrate(conn: Connection):
+        for name in names:
+            _model_index(name).create(bind=conn, checkfirst=True)
+    return migrate
+
+
+def add_column(table_name: str, column_name: str) -> Callable[[Connection], None]:
+    """A migration that adds a column declared in models.py, if missing."""
+    def migrate(conn: Connection):
+        if column_name in {c["name"] for c in inspect(conn).get_columns(table_name)}:
+            return
+        column = Base.metadata.tables[table_name].c[column_name]
+        ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=conn.dialect)}"
+        if column.server_default is not None:
+            ddl += f" DEFAULT {column.server_default.arg}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+        conn.exec_driver_sql(ddl)
+    return migrate
+
+
+def baseline_slot_status_events(conn: Connection):
+    """Starts the status history of slots that have none with their current status."""
+    events = Base.metadata.tables["slot_status_events"]
+    slots = Base.metadata.tables["slots"]
+    conn.execute(events.insert().from_select(
+        ["slot_id", "status", "changed_at"],
+        select(slots.c.id, slots.c.status, literal(datetime.utcnow(), DateTime))
+        .where(~exists().where(events.c.slot_id == slots.c.id))
+    ))
+
+
+# (version, description, migration) - append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Indexes for list pagination and filters", create_indexes(
+        "ix_users_role_id",
+        "ix_slots_status_id",
+        "ix_slots_vehicle_type_id",
+        "ix_bookings_user_start",
+        "ix_bookings_user_status_start",
+        "ix_bookings_user_slot_start",
+        "ix_payments_created_id",
+        "ix_payments_status_created",
+        "ix_vehicles_owner_id",
+        "ix_gate_logs_timestamp_id",
+        "ix_gate_logs_staff_timestamp",
+        "ix_gate_logs_action_timestamp",
+        "ix_gate_logs_booking",
+    )),
+    (2, "Indexes for the booking overlap check and payment lookup", create_indexes(
+        "ix_bookings_slot_status_time",
+        "ix_payments_provider_transaction_id",
+    )),
+    (3, "Slot version used as the per-slot booking lock", add_column("slots", "version")),
+    (4, "Baseline slot status history for occupancy analytics", baseline_slot_status_events),
+    (5, "Index for gate log pages filtered by slot", create_indexes("ix_gate_logs_booking_timestamp")),
+]
+
+
+@contextmanager
+def migration_lock(engine: Engine) -> Iterator[None]:
+    """Held by one process at a time, across all workers on the database."""
+    backend, database = engine.dialect.name, engine.url.database
+    if backend == "mysql":
+        with engine.connect() as conn:
+            acquired = conn.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT_SECONDS}
+            ).scalar()
+            if acquired != 1:
+                raise RuntimeError(f"Timed out waiting for the {LOCK_NAME!r} lock")
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+    elif backend == "sqlite" and database not in (None, "", ":memory:"):
+        try:
+            import fcntl  # Unix only
+        except ImportError:
+            yield  # no multi-worker uvicorn here either
+            return
+        fd = os.open(database + ".migrate.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # releases the lock
+    else:
+        yield  # in-memory: only this process sees the database
+
+
+def run_migrations(engine: Engine):
+    """Creates missing tables, then applies the pending migrations."""
+    with migration_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        version_metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            current = conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            with engine.begin() as conn:
+                migrate(conn)
+                conn.execute(schema_version.insert().values(version=version, description=description))
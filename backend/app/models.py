@@ -4,7 +4,7 @@ import enum
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, DateTime, 
-    Boolean, Enum, ForeignKey, Float
+    Boolean, Enum, ForeignKey, Float, Index
 )
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -45,6 +45,11 @@ class User(Base):
     bookings = relationship("Booking", back_populates="user")
     vehicles = relationship("Vehicle", back_populates="owner")
 
+    # Supports the admin user list filter (see crud.get_users)
+    __table_args__ = (
+        Index("ix_users_role_id", "role", "id"),
+    )
+
 class Slot(Base):
     __tablename__ = "slots"
     id = Column(Integer, primary_key=True, index=True)
@@ -53,8 +58,17 @@ class Slot(Base):
     status = Column(Enum(SlotStatus), nullable=False, default=SlotStatus.available)
     # --- ADD THIS LINE ---
     price_per_hour = Column(Float, nullable=False, default=5.0) # Default ₹5/hr
+    # Bumped by every booking of this slot; the UPDATE is the per-slot lock
+    # (see crud_async.create_booking)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     bookings = relationship("Booking", back_populates="slot")
 
+    # Slot lookups by status and by vehicle type (see crud_async.rank_free_slots)
+    __table_args__ = (
+        Index("ix_slots_status_id", "status", "id"),
+        Index("ix_slots_vehicle_type_id", "vehicle_type", "id"),
+    )
+
 class Booking(Base):
     __tablename__ = "bookings"
     id = Column(Integer, primary_key=True, index=True)
@@ -72,6 +86,15 @@ class Booking(Base):
     payment = relationship("Payment", back_populates="booking", uselist=False)
     vehicle = relationship("Vehicle")
 
+    # Support the "my bookings" pages and filters (see crud.get_bookings_by_user)
+    # and the overlap check (crud_async.check_slot_availability)
+    __table_args__ = (
+        Index("ix_bookings_slot_status_time", "slot_id", "status", "start_time", "end_time"),
+        Index("ix_bookings_user_start", "user_id", "start_time", "id"),
+        Index("ix_bookings_user_status_start", "user_id", "status", "start_time", "id"),
+        Index("ix_bookings_user_slot_start", "user_id", "slot_id", "start_time", "id"),
+    )
+
 class Payment(Base):
     __tablename__ = "payments"
     id = Column(Integer, primary_key=True, index=True)
@@ -84,6 +107,13 @@ class Payment(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     booking = relationship("Booking", back_populates="payment")
 
+    # Support the "my payments" pages and filters (see crud.get_payments_by_user)
+    __table_args__ = (
+        Index("ix_payments_created_id", "created_at", "id"),
+        Index("ix_payments_status_created", "status", "created_at", "id"),
+        Index("ix_payments_provider_transaction_id", "provider_transaction_id"),  # crud.update_payment_record
+    )
+
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
@@ -94,7 +124,7 @@ class Vehicle(Base):
     model = Column(String(50), nullable=True) # e.g., "Camry"
     
     # --- Link to the user ---
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     owner = relationship("User", back_populates="vehicles")
 
     def __repr__(self):
@@ -114,4 +144,45 @@ class GateLog(Base):
     vehicle_plate = Column(String(50))
 
     staff = relationship("User")
-    booking = relationship("Booking")
\ No newline at end of file
+    booking = relationship("Booking")
+
+    # Support the gate log pages and filters (see crud.get_gate_logs)
+    __table_args__ = (
+        Index("ix_gate_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_gate_logs_staff_timestamp", "staff_id", "timestamp", "id"),
+        Index("ix_gate_logs_action_timestamp", "action", "timestamp", "id"),
+        Index("ix_gate_logs_booking", "booking_id"),
+        Index("ix_gate_logs_booking_timestamp", "booking_id", "timestamp", "id"),
+    )
+
+
+# Every event received from an offline gate terminal, applied or not,
+# so replays of the same batch are idempotent (see POST /gate/events:batch)
+class GateEvent(Base):
+    __tablename__ = "gate_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_event_id = Column(String(64), unique=True, nullable=False)
+    staff_id = Column(Integer, ForeignKey("users.id"))
+    booking_id_str = Column(String(50))
+    action = Column(String(50)) # "check-in" or "check-out"
+    result = Column(String(20)) # "applied" or "rejected"
+    detail = Column(String(255), nullable=True)
+    received_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Append-only history of slot statuses behind the occupancy analytics
+# (see occupancy.py). Written in the same transaction as the status change.
+# status None: the slot was deleted. No foreign key on slot_id, so the
+# history of a deleted slot stays.
+class SlotStatusEvent(Base):
+    __tablename__ = "slot_status_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    slot_id = Column(Integer, nullable=False)
+    status = Column(Enum(SlotStatus), nullable=True)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_slot_status_events_slot_changed", "slot_id", "changed_at"),
+    )
@@ -0,0 +1,234 @@
+# backend/app/occupancy.py
+#
+# Slot occupancy analytics over the slot status history
+# (models.SlotStatusEvent), for GET /admin/analytics/occupancy.
+#
+# The history is kept in the process as packed NumPy arrays sorted by
+# (slot, time). Events added since the last read are buffered and merged
+# into them in batches, so a request never walks ORM objects. Occupancy per bucket is
+# then computed for every group at once with cumulative sums and
+# searchsorted (see _covered_seconds).
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+EPOCH = datetime(2000, 1, 1)
+SPAN = 1 << 32  # seconds; sort key = slot_id * SPAN + seconds since EPOCH
+DELETED = -1  # status code of a "slot deleted" event
+STATUS_CODES = {status: code for code, status in enumerate(models.SlotStatus)}
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+MAX_BUCKETS = 10_000  # a year and some of hours
+MAX_CELLS = 2_000_000  # groups x buckets in one response
+REREAD_IDS = 1000  # events this far below the newest id may still commit late
+MERGE_BATCH = 50_000  # buffered events that trigger a merge before any read
+
+
+def _seconds(value: datetime) -> int:
+    if value.tzinfo is not None:  # stored times are naive UTC
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((value - EPOCH).total_seconds())
+
+
+def _covered_seconds(groups: np.ndarray, starts: np.ndarray, ends: np.ndarray, n_groups: int, edges: np.ndarray) -> np.ndarray:
+    """
+    For intervals [start, end) labelled with a group, the seconds each group
+    has covered before each edge, as a (n_groups, len(edges)) array.
+
+    Covered(x) = sum(x - start for start < x) - sum(x - end for end < x),
+    and both sums come from one sorted array + cumulative sum per side:
+    searchsorted gives how many points lie before x in the group, the
+    cumulative sum gives their total.
+    """
+    group_keys = np.arange(n_groups, dtype=np.int64) * SPAN
+    query = group_keys[:, None] + edges[None, :]
+
+    def before(points: np.ndarray) -> np.ndarray:
+        keys = np.sort(groups.astype(np.int64) * SPAN + points)
+        sums = np.concatenate(([0], np.cumsum(keys % SPAN)))
+        first = np.searchsorted(keys, group_keys)[:, None]
+        upto = np.searchsorted(keys, query)
+        return (upto - first) * edges[None, :] - (sums[upto] - sums[first])
+
+    return before(starts) - before(ends)
+
+
+class OccupancyStore:
+    """
+    The slot status history as two packed arrays, sorted by (slot, time):
+    `keys` (slot_id * SPAN + seconds) and `codes` (STATUS_CODES, or DELETED).
+    A status lasts until the slot's next event, the latest one until now.
+
+    New events go to a pending buffer first. Merging them copies both
+    arrays, so it is done once per batch: when MERGE_BATCH events are
+    pending, or when a read needs them (snapshot()).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = np.empty(0, dtype=np.int64)
+        self._codes = np.empty(0, dtype=np.int8)
+        self._pending_keys: List[np.ndarray] = []
+        self._pending_codes: List[np.ndarray] = []
+        self._pending_count = 0
+        self._last_id = 0
+        self._recent_ids: Set[int] = set()
+
+    def refresh(self, db: Session) -> int:
+        """
+        Buffers the events added since the last call. Returns how many.
+        Re-reads the last REREAD_IDS ids, because a transaction that got a
+        lower id can commit after a higher one.
+        """
+        with self._lock:
+            floor = max(0, self._last_id - REREAD_IDS)
+            rows = db.execute(
+                select(
+                    models.SlotStatusEvent.id,
+                    models.SlotStatusEvent.slot_id,
+                    models.SlotStatusEvent.status,
+                    models.SlotStatusEvent.changed_at,
+                ).where(models.SlotStatusEvent.id > floor).order_by(models.SlotStatusEvent.id)
+            ).all()
+            rows = [row for row in rows if row.id not in self._recent_ids]
+            if not rows:
+                return 0
+
+            keys = np.fromiter(
+                (row.slot_id * SPAN + _seconds(row.changed_at) for row in rows), dtype=np.int64, count=len(rows)
+            )
+            codes = np.fromiter(
+                (DELETED if row.status is None else STATUS_CODES[row.status] for row in rows), dtype=np.int8, count=len(rows)
+            )
+            self._pending_keys.append(keys)
+            self._pending_codes.append(codes)
+            self._pending_count += len(rows)
+            if self._pending_count >= MERGE_BATCH:
+                self._merge_pending()
+
+            self._last_id = max(self._last_id, rows[-1].id)
+            floor = self._last_id - REREAD_IDS
+            self._recent_ids = {i for i in self._recent_ids if i > floor}
+            self._recent_ids.update(row.id for row in rows if row.id > floor)
+            return len(rows)
+
+    def _merge_pending(self):
+        # Caller holds the lock. One sorted merge for the whole batch.
+        if not self._pending_count:
+            return
+        keys = np.concatenate(self._pending_keys)
+        codes = np.concatenate(self._pending_codes)
+        order = np.argsort(keys, kind="stable")  # same second: id order
+        keys, codes = keys[order], codes[order]
+        at = np.searchsorted(self._keys, keys, side="right")
+        self._keys = np.insert(self._keys, at, keys)
+        self._codes = np.insert(self._codes, at, codes)
+        self._pending_keys, self._pending_codes, self._pending_count = [], [], 0
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The sorted (keys, codes) arrays, including every buffered event."""
+        with self._lock:
+            self._merge_pending()
+            return self._keys, self._codes
+
+    def occupancy(
+        self,
+        db: Session,
+        date_from: datetime,
+        date_to: datetime,
+        granularity: str,
+        group_by: str,
+        include_reserved: bool = False
+    ) -> dict:
+        """
+        Share of each bucket (hour or day, UTC) that the slots of each group
+        (all slots, a vehicle type, or one slot) were occupied, relative to
+        the time they existed. A slot counts as occupied while 'booked'
+        (checked in), and also while 'reserved' with `include_reserved`.
+        Raises ValueError if the response would be too large.
+        """
+        self.refresh(db)
+        keys, codes = self.snapshot()
+
+        bucket = BUCKET_SECONDS[granularity]
+        start = max(0, _seconds(date_from)) // bucket * bucket
+        stop = -(-_seconds(date_to) // bucket) * bucket
+        edges = np.arange(start, max(stop, start + bucket) + 1, bucket, dtype=np.int64)
+
+        # Current slots give the labels and vehicle types
+        slots = db.execute(select(models.Slot.id, models.Slot.slot_number, models.Slot.vehicle_type)).all()
+        slot_ids = keys // SPAN
+        times = keys % SPAN
+        last_of_slot = np.append(slot_ids[1:] != slot_ids[:-1], True)
+        ends = np.maximum(times, np.where(last_of_slot, _seconds(datetime.utcnow()), np.roll(times, -1)))
+
+        if group_by == "total":
+            labels = ["all"]
+            groups = np.zeros(len(keys), dtype=np.int64)
+        elif group_by == "vehicle_type":
+            labels = sorted({slot.vehicle_type for slot in slots})
+            type_index = {vehicle_type: i for i, vehicle_type in enumerate(labels)}
+            size = max(int(slot_ids.max(initial=0)), max((slot.id for slot in slots), default=0)) + 1
+            lookup = np.full(size, -1, dtype=np.int64)
+            for slot in slots:
+                lookup[slot.id] = type_index[slot.vehicle_type]
+            groups = lookup[slot_ids]  # deleted slots: -1, left out
+        else:
+            unique_ids, groups = np.unique(slot_ids, return_inverse=True)
+            numbers = {slot.id: slot.slot_number for slot in slots}
+            labels = [numbers.get(int(slot_id), f"#{slot_id} (deleted)") for slot_id in unique_ids]
+
+        if len(edges) - 1 > MAX_BUCKETS:
+            raise ValueError(f"More than {MAX_BUCKETS} buckets; narrow the date range or use a coarser granularity")
+        if len(labels) * (len(edges) - 1) > MAX_CELLS:
+            raise ValueError(
+                f"{len(labels)} groups x {len(edges) - 1} buckets is too many; narrow the date range or use a coarser granularity"
+            )
+
+        # Only intervals that overlap the range matter
+        occupied_codes = [STATUS_CODES[models.SlotStatus.booked]]
+        if include_reserved:
+            occupied_codes.append(STATUS_CODES[models.SlotStatus.reserved])
+        relevant = (groups >= 0) & (ends > edges[0]) & (times < edges[-1])
+        occupied = relevant & np.isin(codes, occupied_codes)
+        existing = relevant & (codes != DELETED)
+
+        occupied_seconds = np.diff(_covered_seconds(groups[occupied], times[occupied], ends[occupied], len(labels), edges), axis=1)
+        slot_seconds = np.diff(_covered_seconds(groups[existing], times[existing], ends[existing], len(labels), edges), axis=1)
+        ratio = np.full(occupied_seconds.shape, np.nan)
+        np.divide(occupied_seconds, slot_seconds, out=ratio, where=slot_seconds > 0)
+
+        totals = slot_seconds.sum(axis=1)
+        overall = np.full(len(labels), np.nan)
+        np.divide(occupied_seconds.sum(axis=1), totals, out=overall, where=totals > 0)
+
+        return {
+            "granularity": granularity,
+            "group_by": group_by,
+            "include_reserved": include_reserved,
+            "buckets": [(EPOCH + timedelta(seconds=int(edge))).isoformat() for edge in edges[:-1]],
+            "series": [
+                {"key": label, "utilization": overall[i].round(4), "occupancy": ratio[i].round(4)}
+                for i, label in enumerate(labels)
+            ],
+        }
+
+
+# Create a single, global instance
+occupancy_store = OccupancyStore()
+
+
+def refresh_from_db():
+    """Loads new history into the store (blocking, run in a thread). Used to warm it at startup."""
+    db = SessionLocal()
+    try:
+        occupancy_store.refresh(db)
+    finally:
+        db.close()
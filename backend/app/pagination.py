@@ -0,0 +1,97 @@
+# backend/app/pagination.py
+#
+# Keyset (cursor) pagination for the list routes.
+#
+# A page is fetched with `WHERE (sort key) after (last row's sort key)
+# ORDER BY sort key LIMIT n`, so every page costs the same no matter how
+# deep it is (unlike OFFSET). Routes keep returning plain JSON lists; the
+# cursor for the next page is sent in the X-Next-Cursor response header
+# and is absent on the last page.
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import DateTime, and_, or_
+from sqlalchemy.orm import Query as OrmQuery
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class PageParams:
+    """Query parameters shared by every paginated route."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header of the previous page")
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v) if isinstance(col.type, DateTime) else v
+            for col, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _after(columns: Sequence, values: Sequence, descending: bool):
+    """
+    Rows strictly after `values` in the sort order, expanded to
+    a >= x AND ((a > x) OR (a = x AND b > y)). The OR alone is not
+    sargable (SQLite walks the index from its start); the redundant
+    leading bound turns it into an index range seek.
+    """
+    clauses = []
+    for i, (col, value) in enumerate(zip(columns, values)):
+        equal = [c == v for c, v in zip(columns[:i], values[:i])]
+        beyond = col < value if descending else col > value
+        clauses.append(and_(*equal, beyond))
+    leading = columns[0] <= values[0] if descending else columns[0] >= values[0]
+    return and_(leading, or_(*clauses))
+
+
+def paginate(
+    query: OrmQuery,
+    columns: Sequence,
+    page: PageParams,
+    descending: bool = False
+) -> Tuple[List, Optional[str]]:
+    """
+    Returns one page of `query` sorted by `columns` (the last one must be
+    unique, e.g. the primary key) and the cursor of the next page, if any.
+    """
+    if page.cursor:
+        query = query.filter(_after(columns, decode_cursor(page.cursor, columns), descending))
+    query = query.order_by(*(col.desc() if descending else col.asc() for col in columns))
+    rows = query.limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, col.key) for col in columns])
+    return rows, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,13 +1,22 @@
 import os
 import math
+import json
+import asyncio
+import hashlib
+from io import BytesIO
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from . import models
+from .cache import LRUCache
+from .core.config import settings
+from .qr_generator import render_qr
 
 # ReportLab Imports
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor
+from reportlab.lib.utils import ImageReader
 
 # --- Theme Colors ---
 COLOR = {
@@ -40,21 +49,47 @@ def formatted(dt):
 
 
 # ================================================================
-# Main Receipt Function
+# Receipt Data
 # ================================================================
-def generate_booking_receipt(booking: models.Booking, file_path: str):
-    """Generate a clean professional receipt PDF."""
+def receipt_fields(booking: models.Booking) -> dict:
+    """
+    Everything that is printed on the receipt, as plain data.
+    Needs the booking's user and slot loaded.
+    """
+    return {
+        "booking_id_str": booking.booking_id_str,
+        "user_email": booking.user.email,
+        "slot_number": booking.slot.slot_number,
+        "vehicle_type": booking.slot.vehicle_type,
+        "start_time": booking.start_time,
+        "end_time": booking.end_time,
+        "rate": booking.slot.price_per_hour,
+    }
+
+
+def receipt_digest(fields: dict) -> str:
+    """Content hash of the receipt; changes whenever a printed field changes."""
+    raw = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 
-    user = booking.user
-    slot = booking.slot
+# ================================================================
+# Main Receipt Function
+# ================================================================
+def render_receipt_pdf(fields: dict) -> bytes:
+    """
+    Generate a clean professional receipt PDF in memory.
+    Runs in the receipt process pool, so it only takes plain data.
+    """
 
     # --- Price Calculation ---
-    hours = calc_total_hours(booking.start_time, booking.end_time)
-    rate = slot.price_per_hour
+    hours = calc_total_hours(fields["start_time"], fields["end_time"])
+    rate = fields["rate"]
     total_price = hours * rate
 
     # --- PDF Setup ---
-    c = canvas.Canvas(file_path, pagesize=A4)
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
     margin = 0.75 * inch
 
@@ -90,18 +125,18 @@ def generate_booking_receipt(booking: models.Booking, file_path: str):
 
     c.setFillColor(COLOR["primary"])
     c.setFont("Helvetica-Bold", 16)
-    c.drawString(margin, y, f"Booking ID: {booking.booking_id_str}")
+    c.drawString(margin, y, f"Booking ID: {fields['booking_id_str']}")
     y -= line_gap * 1.5
 
     c.setFillColor(COLOR["secondary"])
     c.setFont("Helvetica", 11)
 
     details = [
-        f"User: {user.email}",
-        f"Slot: {slot.slot_number} ({slot.vehicle_type})",
+        f"User: {fields['user_email']}",
+        f"Slot: {fields['slot_number']} ({fields['vehicle_type']})",
         "",
-        f"Start: {formatted(booking.start_time)}",
-        f"End:   {formatted(booking.end_time)}",
+        f"Start: {formatted(fields['start_time'])}",
+        f"End:   {formatted(fields['end_time'])}",
         "",
         f"Rate: ₹{rate:.2f}/hour",
     ]
@@ -131,13 +166,9 @@ def generate_booking_receipt(booking: models.Booking, file_path: str):
     qr_x = width - margin - qr_size
     qr_y = height - header_h - 0.75 * inch - 2.7 * inch
 
-    if booking.qr_code_url:
-        # Extract actual relative path after `/static/`
-        rel_path = booking.qr_code_url.replace("/static/", "")
-        qr_path = os.path.join(STATIC_DIR, rel_path)
-
-        if os.path.exists(qr_path):
-            c.drawImage(qr_path, qr_x, qr_y, width=qr_size, height=qr_size)
+    if fields["booking_id_str"]:
+        qr_image = ImageReader(BytesIO(render_qr(fields["booking_id_str"])))
+        c.drawImage(qr_image, qr_x, qr_y, width=qr_size, height=qr_size)
 
     c.setFont("Helvetica-Oblique", 9)
     c.setFillColor(COLOR["secondary"])
@@ -172,3 +203,43 @@ def generate_booking_receipt(booking: models.Booking, file_path: str):
     # Finish PDF
     c.showPage()
     c.save()
+    return buffer.getvalue()
+
+
+# ================================================================
+# Receipt Cache
+# ================================================================
+# booking id -> (digest, pdf bytes). A cached receipt is only served while
+# its digest still matches the current booking and slot data.
+_receipt_cache = LRUCache(maxsize=settings.RECEIPT_CACHE_SIZE)
+_render_pool: ProcessPoolExecutor | None = None
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=settings.RECEIPT_RENDER_WORKERS)
+    return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+async def get_booking_receipt(booking_id: int, fields: dict) -> bytes:
+    """
+    Returns the PDF of a booking's receipt_fields(), rendering it in the
+    process pool only when the printed data changed.
+    """
+    digest = receipt_digest(fields)
+    cached = _receipt_cache.get(booking_id)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    loop = asyncio.get_running_loop()
+    pdf = await loop.run_in_executor(_get_render_pool(), render_receipt_pdf, fields)
+    _receipt_cache.set(booking_id, (digest, pdf))
+    return pdf
@@ -0,0 +1,39 @@
+# backend/app/qr_generator.py
+
+import hashlib
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+
+from .core.config import settings
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def qr_code_url(booking_id_str: str) -> str:
+    """URL of the on-demand QR endpoint for a booking."""
+    return f"{settings.API_V1_STR}/bookings/qr/{booking_id_str}"
+
+
+def qr_etag(data: str, fmt: str) -> str:
+    """The image only depends on the data and the format, so this never changes."""
+    digest = hashlib.sha1(f"{fmt}:{data}".encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+@lru_cache(maxsize=settings.QR_CACHE_SIZE)
+def render_qr(data: str, fmt: str = "png") -> bytes:
+    """
+    Renders a QR code into memory. CPU bound: call it off the event loop.
+    """
+    buffer = BytesIO()
+    if fmt == "svg":
+        qrcode.make(data, image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qrcode.make(data).save(buffer)
+    return buffer.getvalue()
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from .models import UserRole, SlotStatus, BookingStatus, PaymentStatus
 
 # Base
@@ -49,6 +49,27 @@ class SlotCreate(SlotBase):
 class SlotUpdate(SlotBase):
     pass
 
+# Bulk provisioning: `pattern` is a slot number or a range like "L2-A001..L2-A400"
+class SlotRange(BaseModel):
+    pattern: str
+    vehicle_type: str
+    status: SlotStatus = SlotStatus.available
+    price_per_hour: float
+
+class SlotBulkCreate(BaseModel):
+    slots: List[SlotCreate] = []
+    ranges: List[SlotRange] = []
+
+# Every slot matching `pattern` gets the fields that are set
+class SlotBulkChange(BaseModel):
+    pattern: str
+    vehicle_type: Optional[str] = None
+    status: Optional[SlotStatus] = None
+    price_per_hour: Optional[float] = None
+
+class SlotBulkUpdate(BaseModel):
+    changes: List[SlotBulkChange] = Field(..., min_length=1)
+
 # --- UPDATE THIS SCHEMA ---
 class BookingCreate(BaseModel):
     slot_id: int
@@ -57,6 +78,23 @@ class BookingCreate(BaseModel):
     vehicle_id: int      # <-- ADD THIS
     payment_method: str  # <-- ADD THIS
 
+# The server picks the slot for this one
+class AutoBookingCreate(BaseModel):
+    vehicle_type: str
+    start_time: datetime
+    end_time: datetime
+    vehicle_id: int
+    payment_method: str
+
+    def for_slot(self, slot_id: int) -> BookingCreate:
+        return BookingCreate(
+            slot_id=slot_id,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            vehicle_id=self.vehicle_id,
+            payment_method=self.payment_method
+        )
+
 # Read
 class User(UserBase):
     id: int
@@ -71,6 +109,17 @@ class Slot(SlotBase):
     class Config:
         from_attributes = True
 
+# The Slot schema of an ORM slot as a plain dict, without a validation round
+# trip (built for every slot broadcast)
+def slot_dict(slot) -> dict:
+    return {
+        "slot_number": slot.slot_number,
+        "vehicle_type": slot.vehicle_type,
+        "status": slot.status,
+        "price_per_hour": slot.price_per_hour,
+        "id": slot.id,
+    }
+
 
 
 class Payment(BaseModel): # <-- This is the one to replace
@@ -166,6 +215,26 @@ class GateLog(BaseModel):
         from_attributes = True
 
 
+# --- Batched gate events (offline terminals) ---
+class GateEvent(BaseModel):
+    client_event_id: str = Field(..., min_length=1, max_length=64)
+    booking_id_str: str
+    action: Literal["check-in", "check-out"]
+    client_timestamp: datetime # when the car was scanned
+
+class GateEventBatch(BaseModel):
+    events: List[GateEvent] = Field(..., min_length=1, max_length=500)
+
+class GateEventResult(BaseModel):
+    client_event_id: str
+    result: Literal["applied", "duplicate", "rejected"]
+    detail: Optional[str] = None
+    booking_status: Optional[BookingStatus] = None
+
+class GateEventBatchResult(BaseModel):
+    results: List[GateEventResult]
+
+
 # Auth
 class Token(BaseModel):
     access_token: str
@@ -1,29 +1,90 @@
 # backend/app/security.py
 
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import ValidationError
 from .core.config import settings
+from .cache import LRUCache
 from . import schemas
 
 # 1. Password Hashing
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# argon2 runs on its own small pool. At most WORKERS + QUEUE_LIMIT requests
+# wait on it; the rest get a 503, so a login spike cannot take over the
+# threadpool that every sync route shares.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_hash_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+)
+
+def _acquire_hash_slot():
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The server is busy, please try again shortly.",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+        )
+
+def _run_hashing(fn, *args):
+    _acquire_hash_slot()
+    try:
+        return _hash_pool.submit(fn, *args).result()
+    finally:
+        _hash_slots.release()
+
+async def _run_hashing_async(fn, *args):
+    # For async routes: awaits the pool without holding any thread meanwhile
+    _acquire_hash_slot()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _hash_slots.release()
+
+def _truncate(password: str) -> bytes:
+    return password.encode('utf-8')[:72]
 
 def get_password_hash(password: str) -> str:
-    password_bytes = password.encode('utf-8')
-    truncated_bytes = password_bytes[:72]
-    return pwd_context.hash(truncated_bytes)
+    return _run_hashing(pwd_context.hash, _truncate(password))
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    password_bytes = plain_password.encode('utf-8')
-    truncated_bytes = password_bytes[:72]
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing_async(pwd_context.hash, _truncate(password))
+
+def _verify_and_update(secret: bytes, hashed_password: str) -> tuple[bool, str | None]:
     try:
-        return pwd_context.verify(truncated_bytes, hashed_password)
+        return pwd_context.verify_and_update(secret, hashed_password)
     except Exception:
-        return False
+        return False, None
+
+def verify_password_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Returns (is_valid, new_hash). new_hash is set when the stored hash was
+    made with old argon2 parameters and should be replaced.
+    """
+    return _run_hashing(_verify_and_update, _truncate(plain_password), hashed_password)
+
+async def verify_password_and_update_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await _run_hashing_async(_verify_and_update, _truncate(plain_password), hashed_password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return verify_password_and_update(plain_password, hashed_password)[0]
 
 # 2. OAuth2
 oauth2_scheme = OAuth2PasswordBearer(
@@ -41,10 +102,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 # 4. Token Decoding
+if settings.JWT_BACKEND == "pyjwt":
+    # Alternative verifier; tokens are still issued by jose
+    import jwt as pyjwt
+
+    def _verify_token(token: str) -> dict:
+        try:
+            return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+else:
+    def _verify_token(token: str) -> dict:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+# Already-verified tokens, keyed by a digest of the token, kept until "exp"
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
 def decode_token(token: str) -> schemas.TokenData | None:
+    key = _token_digest(token)
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = _verify_token(token)
         token_data = schemas.TokenData(email=payload.get("sub"))
-        return token_data
     except (JWTError, ValidationError, AttributeError):
-        return None
\ No newline at end of file
+        return None
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(key, token_data, expires_at=float(exp))
+    return token_data
+
+# 5. Principal Cache
+# Resolved users keyed by token subject (email), see dependencies.get_current_user.
+# Must be invalidated whenever a user's email, password or role changes.
+principal_cache = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def invalidate_principal(email: str):
+    principal_cache.pop(email)
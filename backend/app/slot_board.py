@@ -0,0 +1,112 @@
+# backend/app/slot_board.py
+
+import orjson
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from . import models, schemas
+from .database import SessionLocal
+from .websocket_manager import manager
+
+
+class SlotBoard:
+    """
+    Every slot, kept in the process, so GET /slots and the WebSocket
+    snapshot never touch the database.
+
+    Loaded from the slots table at startup, then kept current by the slot
+    changes crud already publishes (manager.publish_slots), which reach
+    every worker through the broadcast bus; resync() catches up on the
+    ones lost while the bus was down. The JSON body for each filter
+    is built once and reused until the board changes.
+
+    Only used from the event loop (bus handler and async routes), so it
+    needs no lock.
+    """
+
+    def __init__(self):
+        self._slots: Dict[int, dict] = {}
+        self._bodies: Dict[Tuple[Optional[str], Optional[str]], bytes] = {}
+        self.version = 0
+        self._missed: Optional[List[dict]] = None  # changes applied while resync() loads
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Reloads the whole board from the slots table. Returns the number of
+        slots.
+        """
+        self._slots = self._load(db)
+        self._changed()
+        return len(self._slots)
+
+    async def resync(self) -> List[dict]:
+        """
+        rebuild() with the query in the threadpool, for a running worker
+        whose bus link was down (see ConnectionManager.on_link). Changes
+        arriving meanwhile are replayed onto the reloaded board. Returns the
+        slots that differed from the old board, deletions included.
+        """
+        self._missed = []
+        try:
+            slots = await run_in_threadpool(self._load_from_db)
+            _apply(slots, self._missed)
+        finally:
+            self._missed = None
+        changed = [slot for slot_id, slot in slots.items() if self._slots.get(slot_id) != slot]
+        changed += [{"id": slot_id, "deleted": True} for slot_id in self._slots.keys() - slots.keys()]
+        self._slots = slots
+        if changed:
+            self._changed()
+        return changed
+
+    def _load_from_db(self) -> Dict[int, dict]:
+        with SessionLocal() as db:
+            return self._load(db)
+
+    @staticmethod
+    def _load(db: Session) -> Dict[int, dict]:
+        slots = db.query(models.Slot).order_by(models.Slot.id).all()
+        return {slot.id: schemas.slot_dict(slot) for slot in slots}
+
+    def apply(self, slots: Iterable[dict]):
+        """Applies published slot changes (schemas.Slot dicts or deletions)."""
+        slots = list(slots)
+        _apply(self._slots, slots)
+        if self._missed is not None:
+            self._missed.extend(slots)
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._bodies = {}
+
+    def slots(self, status: Optional[models.SlotStatus] = None, vehicle_type: Optional[str] = None) -> List[dict]:
+        """The slots matching the filters, by id."""
+        return [
+            slot for _, slot in sorted(self._slots.items())
+            if (status is None or slot["status"] == status)
+            and (vehicle_type is None or slot["vehicle_type"] == vehicle_type)
+        ]
+
+    def body(self, status: Optional[models.SlotStatus] = None, vehicle_type: Optional[str] = None) -> bytes:
+        """slots() as a JSON response body, cached until the next change."""
+        key = (status.value if status is not None else None, vehicle_type)
+        body = self._bodies.get(key)
+        if body is None:
+            body = orjson.dumps(self.slots(status, vehicle_type))
+            self._bodies[key] = body
+        return body
+
+
+def _apply(board: Dict[int, dict], slots: Iterable[dict]):
+    for slot in slots:
+        if slot.get("deleted"):
+            board.pop(slot["id"], None)
+        else:
+            board[slot["id"]] = slot
+
+
+slot_board = SlotBoard()
+
+manager.subscribe("slots", lambda message: slot_board.apply(message["slots"]))
@@ -0,0 +1,44 @@
+# backend/app/slot_ranges.py
+#
+# Slot number patterns for the bulk slot endpoints: a single number
+# ("L2-A007") or an inclusive range ("L2-A001..L2-A400").
+
+import re
+from typing import List
+
+MAX_SLOTS_PER_PATTERN = 10000
+MAX_BULK_SLOTS = 10000
+
+_NUMBERED = re.compile(r"^(.*?)(\d+)$")
+
+
+def expand(pattern: str) -> List[str]:
+    """
+    Expands a range into its slot numbers, keeping the zero padding of the
+    first number ("A098..A101" -> A098, A099, A100, A101). Both ends must
+    share the prefix. Raises ValueError for malformed ranges.
+    """
+    if ".." not in pattern:
+        return [pattern]
+
+    first, _, last = pattern.partition("..")
+    first_match, last_match = _NUMBERED.match(first), _NUMBERED.match(last)
+    if not first_match or not last_match:
+        raise ValueError(f"Range ends must end in a number: {pattern!r}")
+    prefix, start = first_match.group(1), first_match.group(2)
+    if last_match.group(1) != prefix:
+        raise ValueError(f"Range ends must share the same prefix: {pattern!r}")
+
+    width = len(start)
+    start, end = int(start), int(last_match.group(2))
+    if end < start:
+        raise ValueError(f"Range end is before its start: {pattern!r}")
+    if end - start + 1 > MAX_SLOTS_PER_PATTERN:
+        raise ValueError(f"Range has more than {MAX_SLOTS_PER_PATTERN} slots: {pattern!r}")
+    return [f"{prefix}{n:0{width}d}" for n in range(start, end + 1)]
+
+
+def check_bulk_size(count: int):
+    # Keeps one bulk request (and its IN (...) lookups) bounded
+    if count > MAX_BULK_SLOTS:
+        raise ValueError(f"At most {MAX_BULK_SLOTS} slots per bulk request, got {count}")
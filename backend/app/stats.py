@@ -0,0 +1,127 @@
+# backend/app/stats.py
+
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+from .websocket_manager import manager
+
+# Slot statuses counted as "booked" on the dashboard
+BOOKED_STATUSES = (models.SlotStatus.booked.value, models.SlotStatus.reserved.value)
+
+
+class DashboardCounters:
+    """
+    The admin dashboard numbers, kept up to date as slots, users and
+    bookings change, so /admin/stats is a plain read instead of five
+    COUNT(*) queries.
+
+    Changes are published on the broadcast bus (see record_change) and
+    applied by every worker. reconcile() resets the counters from the DB
+    at startup and every STATS_RECONCILE_SECONDS, which also repairs any
+    drift (e.g. a change made while a worker was cut off from the bus).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slot_statuses: Counter = Counter()
+        self._users = 0
+        self._bookings = 0
+        self.version = 0  # bumped whenever the numbers change (ETag of /admin/stats)
+
+    def reconcile(self, db: Session):
+        slot_rows = db.query(models.Slot.status, func.count(models.Slot.id)).group_by(models.Slot.status).all()
+        users = db.query(func.count(models.User.id)).scalar()
+        bookings = db.query(func.count(models.Booking.id)).scalar()
+        with self._lock:
+            before = self._numbers()
+            self._slot_statuses = Counter({status.value: count for status, count in slot_rows})
+            self._users = users
+            self._bookings = bookings
+            if self._numbers() != before:
+                self.version += 1
+
+    def apply(self, slots: Optional[Dict[str, int]] = None, users: int = 0, bookings: int = 0):
+        with self._lock:
+            for status, delta in (slots or {}).items():
+                self._slot_statuses[status] += delta
+            self._users += users
+            self._bookings += bookings
+            self.version += 1
+
+    def snapshot(self) -> dict:
+        return self.versioned_snapshot()[1]
+
+    def versioned_snapshot(self) -> Tuple[int, dict]:
+        """The numbers and the version they belong to, read together."""
+        with self._lock:
+            return self.version, self._numbers()
+
+    def _numbers(self) -> dict:
+        return {
+            "total_slots": sum(self._slot_statuses.values()),
+            "available_slots": self._slot_statuses[models.SlotStatus.available.value],
+            "booked_slots": sum(self._slot_statuses[status] for status in BOOKED_STATUSES),
+            "total_users": self._users,
+            "total_bookings": self._bookings
+        }
+
+
+# Create a single, global instance
+counters = DashboardCounters()
+
+
+def push_stats():
+    """Sends the current numbers to this worker's admin dashboards."""
+    manager.publish_stats(counters.snapshot())
+
+
+def reconcile_from_db():
+    """Resets the counters from the DB and pushes them (blocking, run in a thread)."""
+    db = SessionLocal()
+    try:
+        counters.reconcile(db)
+    finally:
+        db.close()
+    push_stats()
+
+
+def record_change(slots: Optional[Dict[str, int]] = None, users: int = 0, bookings: int = 0):
+    """Publishes a counter change to every worker. Safe from any thread."""
+    manager.publish_event("stats", {"slots": slots or {}, "users": users, "bookings": bookings})
+
+
+def record_slot_status(old: Optional[models.SlotStatus], new: Optional[models.SlotStatus]):
+    """
+    A slot moved from `old` to `new` status. None means the slot did not
+    exist before (created) or does not exist any more (deleted).
+    """
+    record_slot_statuses([(old, new)])
+
+
+def record_slot_statuses(changes: Iterable[Tuple[Optional[models.SlotStatus], Optional[models.SlotStatus]]]):
+    """Many record_slot_status() changes, published as one counter change."""
+    slots: Dict[str, int] = {}
+    for old, new in changes:
+        if old == new:
+            continue
+        if old is not None:
+            slots[old.value] = slots.get(old.value, 0) - 1
+        if new is not None:
+            slots[new.value] = slots.get(new.value, 0) + 1
+    slots = {status: delta for status, delta in slots.items() if delta}
+    if slots:
+        record_change(slots=slots)
+
+
+def _on_stats_event(message: dict):
+    counters.apply(message["slots"], message["users"], message["bookings"])
+    push_stats()
+
+
+manager.subscribe("stats", _on_stats_event)
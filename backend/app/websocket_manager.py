@@ -1,25 +1,321 @@
 # backend/app/websocket_manager.py
+import asyncio
+import orjson
+import uuid
+from collections import deque
 from fastapi import WebSocket
-from typing import List
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from .core.config import settings
+from .broadcast_bus import InProcessBus, create_bus
+
+# What to do when a client's send queue is full
+DROP_OLDEST = "drop_oldest"  # skip the oldest queued message (downgrade)
+DISCONNECT = "disconnect"    # close the slow client, it can reconnect
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    """
+    Fans messages out to every connected dashboard.
+
+    Each connection gets a bounded send queue and its own writer task, so
+    a slow or dead socket only affects itself. Broadcasting serializes the
+    payload once and just enqueues it; it never waits on a socket.
+
+    Slot changes form a versioned stream: a new client gets a snapshot,
+    then batched deltas coalesced over `coalesce_ms`. The last deltas are
+    kept in a ring buffer so a client reconnecting with its last version
+    only receives what it missed.
+
+    All messages go through `bus`, so with several workers every worker
+    fans out every change to its own sockets. Other modules can put their
+    own event kinds on the bus with publish_event() / subscribe(), and
+    reload what they keep from it in on_link() callbacks.
+
+    Admin dashboards connect to a separate stats channel that receives the
+    latest dashboard counters, coalesced like the slot deltas.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 100,
+        slow_consumer_policy: str = DROP_OLDEST,
+        coalesce_ms: int = 50,
+        delta_buffer_size: int = 1000,
+        bus=None
+    ):
+        self.bus = bus if bus is not None else InProcessBus()
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.coalesce_ms = coalesce_ms
+        self.active_connections: Dict[WebSocket, asyncio.Queue] = {}
+        self.stats_connections: Dict[WebSocket, asyncio.Queue] = {}
+        self._handlers: Dict[str, Callable[[dict], None]] = {}
+        self._link_callbacks: List[Callable[[], Awaitable[None]]] = []
+        self._resync_task: asyncio.Task | None = None
+        self._resync_again = False
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        # Versioned slot stream; `epoch` tells apart versions of other server runs
+        self.epoch = uuid.uuid4().hex[:12]
+        self.version = 0
+        self._pending_slots: Dict[int, dict] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._deltas: deque = deque(maxlen=delta_buffer_size)  # (version, [slot, ...])
+
+        # Latest dashboard stats (local to this worker)
+        self._pending_stats: dict | None = None
+        self._last_stats: dict | None = None
+
+    async def start(self):
+        """Binds the manager to the running event loop and joins the bus (app startup)."""
+        self._loop = asyncio.get_running_loop()
+        await self.bus.start(self._on_bus_message, self._on_bus_link)
+
+    async def stop(self):
+        await self.bus.stop()
+        if self._resync_task is not None:
+            self._resync_task.cancel()
+            self._resync_task = None
+
+    def subscribe(self, kind: str, handler: Callable[[dict], None]):
+        """
+        Calls `handler` (on the loop) for every bus message of this kind,
+        including the built-in "slots" and "text" messages.
+        """
+        self._handlers[kind] = handler
+
+    def on_link(self, callback: Callable[[], Awaitable[None]]):
+        """
+        Awaits `callback` each time this worker (re)joins the bus. Messages
+        other workers published while it was not linked never arrive, so
+        state kept from bus messages should be reloaded there.
+        """
+        self._link_callbacks.append(callback)
+
+    def _on_bus_link(self):
+        # A link while a resync still runs reruns it once that one is done
+        if self._resync_task is not None and not self._resync_task.done():
+            self._resync_again = True
+            return
+        self._resync_task = asyncio.create_task(self._resync())
+
+    async def _resync(self):
+        self._resync_again = True
+        while self._resync_again:
+            self._resync_again = False
+            for callback in self._link_callbacks:
+                await callback()
+
+    def publish_event(self, kind: str, payload: dict):
+        """Puts a custom event on the bus for every worker. Safe from any thread."""
+        self._call_on_loop(self.bus.publish, {**payload, "kind": kind})
+
+    def _on_bus_message(self, message: dict):
+        # Runs on the loop for every message published by any worker
+        kind = message["kind"]
+        if kind == "slots":
+            self._queue_slots(message["slots"])
+        elif kind == "text":
+            self._fan_out(message["text"])
+        handler = self._handlers.get(kind)
+        if handler is not None:
+            handler(message)
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        since: Optional[int] = None,
+        epoch: Optional[str] = None,
+        load_snapshot: Optional[Callable[[], Awaitable[List[dict]]]] = None
+    ):
+        """
+        Accepts a client and brings it up to date: the missing deltas if
+        `since` is still in the ring buffer, otherwise a full snapshot.
+        """
+        await websocket.accept()
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+
+        # Register first: every delta after `version` lands in the queue
+        version = self.version
+        self.active_connections[websocket] = queue
 
-    async def connect(self, websocket: WebSocket):
+        missed = None
+        if since is not None and epoch == self.epoch:
+            missed = self._deltas_since(since)
+        if missed is not None:
+            await websocket.send_text(self._encode(
+                {"type": "slot_delta", "epoch": self.epoch, "version": version, "slots": missed}
+            ))
+        elif load_snapshot is not None:
+            slots = await load_snapshot()
+            await websocket.send_text(self._encode(
+                {"type": "slot_snapshot", "epoch": self.epoch, "version": version, "slots": slots}
+            ))
+
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket, queue))
+
+    async def connect_stats(self, websocket: WebSocket):
+        """Accepts an admin dashboard; it gets the current stats, then updates."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._last_stats is not None:
+            queue.put_nowait(self._encode({"type": "stats", "stats": self._last_stats}))
+        self.stats_connections[websocket] = queue
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket, queue))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.pop(websocket, None)
+        self.stats_connections.pop(websocket, None)
+        task = self._writers.pop(websocket, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue):
+        try:
+            while True:
+                message = await queue.get()
+                await websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Dead socket: drop it without touching the other clients
+            self.disconnect(websocket)
+
+    def _enqueue(self, websocket: WebSocket, queue: asyncio.Queue, message: str):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if self.slow_consumer_policy == DISCONNECT:
+                self.disconnect(websocket)
+                asyncio.ensure_future(self._close(websocket))
+                return
+            queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # "try again later"
+        except Exception:
+            pass
+
+    def _fan_out(self, message: str, connections: Dict[WebSocket, asyncio.Queue] | None = None):
+        if connections is None:
+            connections = self.active_connections
+        for websocket, queue in list(connections.items()):
+            self._enqueue(websocket, queue, message)
+
+    def _call_on_loop(self, callback, *args):
+        """Runs `callback` on the manager's loop, from any thread."""
+        loop = self._loop
+        if loop is None:
+            return  # not started, nobody to notify
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            callback(*args)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(callback, *args)
+
+    def send_text_all(self, message: str):
+        """
+        Enqueues a message for every client. Safe to call from sync routes
+        running in the threadpool.
+        """
+        self._call_on_loop(self.bus.publish, {"kind": "text", "text": message})
+
+    @staticmethod
+    def _encode(data: dict) -> str:
+        # Encoded once per message and shared by every client's queue
+        return orjson.dumps(data).decode("utf-8")
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        self.send_text_all(message)
     
     async def broadcast_json(self, data: dict):
-        for connection in self.active_connections:
-            await connection.send_json(data)
+        # Serialized once for all clients
+        self.send_text_all(self._encode(data))
+
+    # --- Versioned slot stream ---
+
+    def publish_slots(self, slots: Iterable[dict]):
+        """
+        Queues slot changes (schemas.Slot dicts, or {"id": .., "deleted": True})
+        for the next coalesced delta. Safe to call from any thread.
+        """
+        self._call_on_loop(self.bus.publish, {"kind": "slots", "slots": list(slots)})
+
+    def publish_slot(self, slot: dict):
+        self.publish_slots([slot])
+
+    def queue_local_slots(self, slots: List[dict]):
+        """
+        Queues slot changes for this worker's dashboards only, e.g. the ones
+        found by a resync (the other workers have them already). Loop only.
+        """
+        self._queue_slots(slots)
+
+    def _queue_slots(self, slots: List[dict]):
+        for slot in slots:
+            self._pending_slots[slot["id"]] = slot  # last write wins
+        self._schedule_flush()
+
+    def publish_stats(self, stats: dict):
+        """
+        Queues the latest dashboard stats for this worker's stats channel.
+        Only the newest value per coalescing window is sent.
+        """
+        self._call_on_loop(self._queue_stats, stats)
+
+    def _queue_stats(self, stats: dict):
+        self._pending_stats = stats
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.coalesce_ms / 1000, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        if self._pending_stats is not None:
+            self._last_stats = self._pending_stats
+            self._pending_stats = None
+            self._fan_out(self._encode({"type": "stats", "stats": self._last_stats}), self.stats_connections)
+        if not self._pending_slots:
+            return
+        slots = list(self._pending_slots.values())
+        self._pending_slots.clear()
+        self.version += 1
+        self._deltas.append((self.version, slots))
+        self._fan_out(self._encode(
+            {"type": "slot_delta", "epoch": self.epoch, "version": self.version, "slots": slots}
+        ))
+
+    def _deltas_since(self, since: int) -> Optional[List[dict]]:
+        """
+        The merged slot changes after version `since`, or None if the ring
+        buffer no longer reaches back that far (client needs a snapshot).
+        """
+        if since > self.version:
+            return None
+        if since == self.version:
+            return []
+        if not self._deltas or self._deltas[0][0] > since + 1:
+            return None
+        merged: Dict[int, dict] = {}
+        for version, slots in self._deltas:
+            if version > since:
+                for slot in slots:
+                    merged[slot["id"]] = slot
+        return list(merged.values())
 
 # Create a single, global instance
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    slow_consumer_policy=settings.WS_SLOW_CONSUMER_POLICY,
+    coalesce_ms=settings.WS_COALESCE_MS,
+    delta_buffer_size=settings.WS_DELTA_BUFFER_SIZE,
+    bus=create_bus(settings.BROADCAST_BACKEND, settings.BROADCAST_SOCKET_PATH)
+)
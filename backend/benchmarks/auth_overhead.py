@@ -0,0 +1,51 @@
+# backend/benchmarks/auth_overhead.py
+#
+# Per-request token check cost, before and after the verified-token cache:
+#
+#   cd backend && python -m benchmarks.auth_overhead [--number 20000]
+#
+# "before" is what decode_token did on every request: a full jose decode
+# with signature check, then a schemas.TokenData. The other rows are the
+# PyJWT verifier (JWT_BACKEND=pyjwt) on the same work, and decode_token
+# itself on a cache miss and on a cache hit.
+
+import argparse
+import timeit
+
+from . import common  # noqa: F401  (test database settings)
+import jwt as pyjwt
+from jose import jwt
+
+from app import schemas, security
+from app.core.config import settings
+
+
+def main(number: int):
+    tokens = [security.create_access_token({"sub": f"user{i}@bench.io"}) for i in range(number)]
+    token = tokens[0]
+    key, algorithms = settings.SECRET_KEY, [settings.ALGORITHM]
+    misses = iter(tokens[1:])
+
+    cases = [
+        ("before: jose decode + TokenData", lambda: schemas.TokenData(email=jwt.decode(token, key, algorithms=algorithms)["sub"])),
+        ("pyjwt decode + TokenData", lambda: schemas.TokenData(email=pyjwt.decode(token, key, algorithms=algorithms)["sub"])),
+        (f"decode_token, cache miss ({settings.JWT_BACKEND})", lambda: security.decode_token(next(misses))),
+        ("decode_token, cache hit", lambda: security.decode_token(token)),
+    ]
+    security.decode_token(token)  # the hit case starts warm
+    print(f"{number} calls each")
+    for name, call in cases:
+        if "miss" in name:
+            calls = number - 1  # every other token once
+            seconds = timeit.timeit(call, number=calls)
+        else:
+            calls = number
+            seconds = min(timeit.repeat(call, number=calls, repeat=3))
+        print(f"  {name:<40} {seconds / calls * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.number)
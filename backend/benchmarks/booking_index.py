@@ -0,0 +1,124 @@
+# backend/benchmarks/booking_index.py
+#
+# Booking availability check: the in-memory SlotIntervalIndex against the
+# overlap query it replaced on the fast path:
+#
+#   cd backend && python -m benchmarks.booking_index [--slots 10000] [--bookings 1000000] [--number 2000]
+#
+# Seeds `bookings` upcoming bookings spread over `slots` slots (2 hours
+# each, 3 hours apart per slot), then asks both for the same random
+# 1-hour windows (about one in six is free). Also reports how
+# long rebuilding the index takes at startup and how much memory it holds.
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from . import common
+from sqlalchemy import insert
+
+from app import crud_async, models
+from app.booking_index import booking_index
+from app.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.main import app  # noqa: F401  (creates the tables)
+
+START = datetime(2031, 1, 1)
+CHUNK = 50_000
+
+
+def seed(slots: int, bookings: int):
+    db = SessionLocal()
+    try:
+        stamp = time.time_ns()
+        customer = models.User(email=f"user{stamp}@bench.io", hashed_password="x")
+        db.add(customer)
+        db.flush()
+        vehicle = models.Vehicle(license_plate=f"BI{stamp}", owner_id=customer.id)
+        db.add(vehicle)
+        db.flush()
+        first_slot = db.execute(insert(models.Slot).returning(models.Slot.id), [
+            {"slot_number": f"I{stamp}-{i}", "vehicle_type": "Car", "price_per_hour": 5.0} for i in range(slots)
+        ]).scalars().all()[0]
+        for chunk_start in range(0, bookings, CHUNK):
+            rows = []
+            for i in range(chunk_start, min(bookings, chunk_start + CHUNK)):
+                begin = START + timedelta(hours=3 * (i // slots))
+                rows.append({
+                    "user_id": customer.id, "slot_id": first_slot + i % slots, "vehicle_id": vehicle.id,
+                    "start_time": begin, "end_time": begin + timedelta(hours=2),
+                    "status": models.BookingStatus.upcoming, "payment_method": "cash"
+                })
+            db.execute(insert(models.Booking), rows)
+        db.commit()
+        return first_slot
+    finally:
+        db.close()
+
+
+def probes(first_slot: int, slots: int, bookings: int, number: int) -> list:
+    hours = 3 * -(-bookings // slots)
+    windows = []
+    for _ in range(number):
+        begin = START + timedelta(minutes=30 * random.randrange(2 * hours))
+        windows.append((first_slot + random.randrange(slots), begin, begin + timedelta(hours=1)))
+    return windows
+
+
+async def query_checks(windows: list) -> tuple:
+    samples, answers = [], []
+    async with AsyncSessionLocal() as db:
+        for slot_id, begin, end in windows[:50]:  # warm up the pool and page cache
+            await crud_async.check_slot_availability(db, slot_id, begin, end)
+        for slot_id, begin, end in windows:
+            started = time.perf_counter()
+            answers.append(await crud_async.check_slot_availability(db, slot_id, begin, end))
+            samples.append(common.timed_ms(started))
+    await async_engine.dispose()
+    return samples, answers
+
+
+def main(slots: int, bookings: int, number: int):
+    started = time.perf_counter()
+    first_slot = seed(slots, bookings)
+    print(f"seeded {slots} slots, {bookings} bookings in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        booking_index.rebuild(db)
+        print(f"index rebuild: {time.perf_counter() - started:.2f}s")
+        tracemalloc.start()
+        booking_index.rebuild(db)
+        print(f"index size: {tracemalloc.get_traced_memory()[0] / 2**20:.0f} MiB")
+        tracemalloc.stop()
+    finally:
+        db.close()
+
+    windows = probes(first_slot, slots, bookings, number)
+    query_ms, expected = asyncio.run(query_checks(windows))
+
+    index_ms, answers = [], []
+    for slot_id, begin, end in windows:
+        started = time.perf_counter()
+        answers.append(booking_index.is_available(slot_id, begin, end))
+        index_ms.append(common.timed_ms(started))
+
+    print(f"database: {common.os.environ['DATABASE_URL']}, {sum(expected)}/{number} windows free")
+    print(common.summary("overlap query", query_ms))
+    print(common.summary("index        ", index_ms))
+    print(f"index mean: {sum(index_ms) / len(index_ms) * 1000:.2f}us vs query mean: {sum(query_ms) / len(query_ms) * 1000:.0f}us")
+    mismatches = sum(a != b for a, b in zip(answers, expected))
+    if mismatches:
+        print(f"WARNING: index and query disagree on {mismatches} windows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=10_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.slots, args.bookings, args.number)
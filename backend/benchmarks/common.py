@@ -0,0 +1,75 @@
+# backend/benchmarks/common.py
+#
+# Shared setup for the benchmark scripts (run from backend/, e.g.
+# `python -m benchmarks.gate_latency`). Settings are read when `app` is
+# imported, so this module is imported first: it points the app at a
+# throwaway SQLite database unless DATABASE_URL is already set.
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Sequence
+
+_db_dir = tempfile.mkdtemp(prefix="sps-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+
+from app import models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.security import get_password_hash  # noqa: E402
+
+PASSWORD = "password1"
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summary(name: str, samples_ms: Sequence[float]) -> str:
+    return (
+        f"{name}: n={len(samples_ms)} p50={percentile(samples_ms, 50):.2f}ms "
+        f"p90={percentile(samples_ms, 90):.2f}ms p99={percentile(samples_ms, 99):.2f}ms "
+        f"max={max(samples_ms):.2f}ms"
+    )
+
+
+def timed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def seed_bookings(count: int, slots: int = 50) -> tuple:
+    """
+    A staff user, a customer with one vehicle, `slots` slots and `count`
+    upcoming bookings spread over them. Returns (staff id, staff email,
+    booking id strings).
+    """
+    db = SessionLocal()
+    try:
+        stamp = time.time_ns()
+        staff = models.User(email=f"staff{stamp}@bench.io", hashed_password=get_password_hash(PASSWORD), role=models.UserRole.staff)
+        customer = models.User(email=f"user{stamp}@bench.io", hashed_password=get_password_hash(PASSWORD))
+        db.add_all([staff, customer])
+        db.flush()
+        vehicle = models.Vehicle(license_plate=f"BN{stamp}", owner_id=customer.id)
+        lot = [models.Slot(slot_number=f"B{stamp}-{i}", vehicle_type="Car", price_per_hour=5.0) for i in range(slots)]
+        db.add(vehicle)
+        db.add_all(lot)
+        db.flush()
+
+        start = datetime.utcnow() + timedelta(days=1)
+        bookings: List[models.Booking] = []
+        for i in range(count):
+            begin = start + timedelta(hours=3 * (i // slots))
+            bookings.append(models.Booking(
+                user_id=customer.id, slot_id=lot[i % slots].id, vehicle_id=vehicle.id,
+                start_time=begin, end_time=begin + timedelta(hours=2), payment_method="cash"
+            ))
+        db.add_all(bookings)
+        db.flush()
+        for booking in bookings:
+            booking.booking_id_str = f"SPS-{booking.id + 1000}"
+        db.commit()
+        return staff.id, staff.email, [booking.booking_id_str for booking in bookings]
+    finally:
+        db.close()
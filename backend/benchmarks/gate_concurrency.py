@@ -0,0 +1,115 @@
+# backend/benchmarks/gate_concurrency.py
+#
+# What concurrent gate traffic does to the rest of the event loop:
+#
+#   cd backend && python -m benchmarks.gate_concurrency [--count 1000] [--concurrency 20]
+#
+# Runs the same check-in/check-out traffic twice, while a probe keeps
+# calling GET /slots/ (served on the same loop as /ws/slots) and
+# measuring how late the loop wakes up from a 5 ms sleep:
+#
+# - "blocking": the gate work on the sync Session straight from the
+#   coroutine, as the async gate routes did before crud_async (log
+#   commit, booking/slot commit, refreshes). Every DB call stalls the loop.
+# - "async": crud_async, as the routes do now.
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from . import common
+from app import crud, crud_async, models
+from app.database import AsyncSessionLocal, SessionLocal
+from app.main import app
+
+PROBE_INTERVAL = 0.005
+
+
+def _blocking_gate(booking_id_str: str, staff_id: int, action: str):
+    _, to_status, slot_status = crud_async.GATE_TRANSITIONS[action]
+    db = SessionLocal()
+    try:
+        booking = crud.get_booking_by_id_str(db, booking_id_str)
+        db.add(models.GateLog(staff_id=staff_id, booking_id=booking.id, action=action, vehicle_plate=booking.vehicle.license_plate))
+        db.commit()
+        booking.status = to_status
+        booking.slot.status = slot_status
+        db.commit()
+        db.refresh(booking)
+        db.refresh(booking.slot)
+    finally:
+        db.close()
+
+
+async def _async_gate(booking_id_str: str, staff_id: int, action: str):
+    async with AsyncSessionLocal() as db:
+        booking = await crud_async.get_booking_by_id_str(db, booking_id_str)
+        await crud_async.gate_transition(db, booking, staff_id, action)
+
+
+async def _traffic(mode: str, booking_ids, staff_id: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(booking_id_str, action):
+        async with semaphore:
+            started = time.perf_counter()
+            if mode == "blocking":
+                _blocking_gate(booking_id_str, staff_id, action)
+                await asyncio.sleep(0)  # a route would yield here to send its response
+            else:
+                await _async_gate(booking_id_str, staff_id, action)
+            latencies.append(common.timed_ms(started))
+
+    for action in ("check-in", "check-out"):
+        await asyncio.gather(*(one(booking_id_str, action) for booking_id_str in booking_ids))
+    return latencies
+
+
+async def _probe(http: httpx.AsyncClient, stop: asyncio.Event, requests: list, lags: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(common.timed_ms(started) - PROBE_INTERVAL * 1000)
+        started = time.perf_counter()
+        response = await http.get("/api/v1/slots/")
+        response.raise_for_status()
+        requests.append(common.timed_ms(started))
+
+
+async def _measure(mode: str, booking_ids, staff_id: int, concurrency: int, http: httpx.AsyncClient):
+    stop = asyncio.Event()
+    requests, lags = [], []
+    probe = asyncio.create_task(_probe(http, stop, requests, lags))
+    started = time.perf_counter()
+    latencies = await _traffic(mode, booking_ids, staff_id, concurrency)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    print(f"{mode}: {len(latencies) / elapsed:.0f} gate ops/s")
+    print("  " + common.summary("gate op     ", latencies))
+    print("  " + common.summary("GET /slots/ ", requests))
+    print("  " + common.summary("loop lag    ", lags))
+
+
+async def main(count: int, concurrency: int):
+    staff_id, staff_email, booking_ids = common.seed_bookings(2 * count)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            token = await http.post("/api/v1/auth/token", data={"username": staff_email, "password": common.PASSWORD})
+            http.headers["Authorization"] = f"Bearer {token.json()['access_token']}"
+            print(f"database: {common.os.environ['DATABASE_URL']}, {count} check-ins + check-outs, concurrency {concurrency}")
+            await _measure("blocking", booking_ids[:count], staff_id, concurrency, http)
+            await _measure("async", booking_ids[count:], staff_id, concurrency, http)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.concurrency))
@@ -0,0 +1,60 @@
+# backend/benchmarks/gate_latency.py
+#
+# Gate check-in / check-out latency on the configured database:
+#
+#   cd backend && python -m benchmarks.gate_latency [--count 1000] [--concurrency 1]
+#
+# Each operation is what POST /gate/checkin and /gate/checkout do after
+# auth: a fresh AsyncSession, the booking lookup and gate_transition
+# (one guarded UPDATE + slot UPDATE + log INSERT, one commit). The target
+# is a single-digit-millisecond p99 on local SQLite.
+
+import argparse
+import asyncio
+import time
+
+from . import common
+from app import crud_async
+from app.database import AsyncSessionLocal
+from app.main import app
+
+
+async def _gate(booking_id_str: str, staff_id: int, action: str) -> float:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        booking = await crud_async.get_booking_by_id_str(db, booking_id_str)
+        if await crud_async.gate_transition(db, booking, staff_id, action) is None:
+            raise RuntimeError(f"{action} of {booking_id_str} was rejected")
+    return common.timed_ms(started)
+
+
+async def _run(booking_ids, staff_id: int, action: str, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(booking_id_str):
+        async with semaphore:
+            return await _gate(booking_id_str, staff_id, action)
+
+    return await asyncio.gather(*(one(booking_id_str) for booking_id_str in booking_ids))
+
+
+async def main(count: int, concurrency: int):
+    staff_id, _, booking_ids = common.seed_bookings(count)
+    async with app.router.lifespan_context(app):
+        await _run(booking_ids[:20], staff_id, "check-in", 1)  # warm up pools and caches
+        await _run(booking_ids[:20], staff_id, "check-out", 1)
+        booking_ids = booking_ids[20:]
+        checkins = await _run(booking_ids, staff_id, "check-in", concurrency)
+        checkouts = await _run(booking_ids, staff_id, "check-out", concurrency)
+    print(f"database: {common.os.environ['DATABASE_URL']}, concurrency {concurrency}")
+    print(common.summary("check-in ", checkins))
+    print(common.summary("check-out", checkouts))
+    print(common.summary("both     ", checkins + checkouts))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.count + 20, args.concurrency))
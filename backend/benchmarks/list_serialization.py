@@ -0,0 +1,138 @@
+# backend/benchmarks/list_serialization.py
+#
+# Large list responses and WebSocket messages, before and after orjson:
+#
+#   cd backend && python -m benchmarks.list_serialization [--rows 1000] [--number 30]
+#
+# Times full GET requests for a `rows`-row page of /bookings/me,
+# /gate/logs and /users/me/payments (mean of `number`), first with the
+# routes' json_responses.list_response swapped back for what FastAPI did
+# before (validate against response_model, dump to JSON-able Python,
+# stdlib json.dumps in a JSONResponse), then as shipped. Also times
+# encoding a 600-slot WebSocket snapshot with json.dumps and with
+# ConnectionManager._encode (orjson).
+
+import argparse
+import asyncio
+import json
+import time
+import timeit
+from datetime import datetime, timedelta
+from statistics import mean
+
+from . import common
+import httpx
+from fastapi.responses import JSONResponse
+
+from app import json_responses, models, schemas
+from app.api import bookings, gate, users
+from app.database import SessionLocal
+from app.main import app
+from app.security import get_password_hash
+from app.websocket_manager import manager
+
+ROUTES = [bookings, gate, users]  # the modules whose list routes are timed
+
+
+def before_list_response(schema, rows, response):
+    adapter = json_responses.list_adapter(schema)
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return JSONResponse(content=content, headers=headers)
+
+
+def seed(rows: int) -> tuple:
+    """A customer with `rows` paid bookings and a staff user with `rows` gate logs."""
+    db = SessionLocal()
+    try:
+        stamp = time.time_ns()
+        hashed = get_password_hash(common.PASSWORD)
+        staff = models.User(email=f"staff{stamp}@bench.io", hashed_password=hashed, role=models.UserRole.staff)
+        customer = models.User(email=f"user{stamp}@bench.io", hashed_password=hashed)
+        db.add_all([staff, customer])
+        db.flush()
+        vehicle = models.Vehicle(license_plate=f"LS{stamp}", owner_id=customer.id)
+        slot = models.Slot(slot_number=f"L{stamp}", vehicle_type="Car", price_per_hour=5.0)
+        db.add_all([vehicle, slot])
+        db.flush()
+
+        start = datetime(2031, 1, 1)
+        booked = [
+            models.Booking(
+                user_id=customer.id, slot_id=slot.id, vehicle_id=vehicle.id, booking_id_str=f"LS{stamp}-{i}",
+                start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i + 1), payment_method="cash"
+            )
+            for i in range(rows)
+        ]
+        db.add_all(booked)
+        db.flush()
+        db.add_all([
+            models.Payment(booking_id=booking.id, amount=5.0, payment_method="cash", status=models.PaymentStatus.completed)
+            for booking in booked
+        ])
+        db.add_all([
+            models.GateLog(staff_id=staff.id, booking_id=booking.id, action="check-in",
+                           vehicle_plate=vehicle.license_plate, timestamp=booking.start_time)
+            for booking in booked
+        ])
+        db.commit()
+        return customer.email, staff.email
+    finally:
+        db.close()
+
+
+async def time_requests(http: httpx.AsyncClient, path: str, headers: dict, number: int) -> float:
+    await http.get(path, headers=headers)  # warm up
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        response = await http.get(path, headers=headers)
+        response.raise_for_status()
+        samples.append(common.timed_ms(started))
+    return mean(samples)
+
+
+async def main(rows: int, number: int):
+    customer_email, staff_email = seed(rows)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            headers = {}
+            for email in (customer_email, staff_email):
+                token = await http.post("/api/v1/auth/token", data={"username": email, "password": common.PASSWORD})
+                headers[email] = {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+            cases = [
+                (f"/api/v1/bookings/me?limit={rows}", headers[customer_email]),
+                (f"/api/v1/gate/logs?limit={rows}", headers[staff_email]),
+                (f"/api/v1/users/me/payments?limit={rows}", headers[customer_email]),
+            ]
+            results = {}
+            for label, list_response in (("before", before_list_response), ("after", json_responses.list_response)):
+                for module in ROUTES:
+                    module.list_response = list_response
+                for path, auth in cases:
+                    results.setdefault(path, {})[label] = await time_requests(http, path, auth, number)
+
+    print(f"{rows}-row pages, mean of {number} requests, before -> after")
+    for path, timings in results.items():
+        print(f"  GET {path.split('?')[0][len('/api/v1'):]:<20} {timings['before']:7.1f}ms -> {timings['after']:7.1f}ms")
+
+    slots = [
+        schemas.slot_dict(models.Slot(id=i, slot_number=f"S-{i}", vehicle_type="Car",
+                                      status=models.SlotStatus.available, price_per_hour=5.0))
+        for i in range(600)
+    ]
+    message = {"type": "slot_snapshot", "epoch": manager.epoch, "version": 1, "slots": slots}
+    encodes = 1000
+    before = min(timeit.repeat(lambda: json.dumps(message), number=encodes, repeat=3)) / encodes * 1000
+    after = min(timeit.repeat(lambda: manager._encode(message), number=encodes, repeat=3)) / encodes * 1000
+    print(f"  600-slot WS snapshot encode  {before:.2f}ms -> {after:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.number))
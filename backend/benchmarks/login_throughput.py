@@ -0,0 +1,60 @@
+# backend/benchmarks/login_throughput.py
+#
+# Login throughput with the configured argon2 parameters:
+#
+#   cd backend && python -m benchmarks.login_throughput [--count 200] [--concurrency 4]
+#
+# Sends `count` POST /auth/token requests, `concurrency` at a time (keep it
+# within PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT or the extra
+# ones get a 503), and reports logins/sec and logins/sec/core. "Per core"
+# divides by the CPU time the process used, so it does not depend on how
+# many hash workers or cores were busy.
+
+import argparse
+import asyncio
+import os
+import time
+
+from . import common
+import httpx
+
+from app.core.config import settings
+from app.main import app
+
+
+async def main(count: int, concurrency: int):
+    _, email, _ = common.seed_bookings(0, slots=1)
+    form = {"username": email, "password": common.PASSWORD}
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            async def login():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await http.post("/api/v1/auth/token", data=form)
+                    response.raise_for_status()
+                    samples.append(common.timed_ms(started))
+
+            await asyncio.gather(*(login() for _ in range(concurrency)))  # warm up
+            samples.clear()
+            wall, cpu = time.perf_counter(), time.process_time()
+            await asyncio.gather(*(login() for _ in range(count)))
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    print(
+        f"argon2 t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST}KiB p={settings.ARGON2_PARALLELISM}, "
+        f"{settings.PASSWORD_HASH_WORKERS} hash workers, {os.cpu_count()} cores, concurrency {concurrency}"
+    )
+    print(common.summary("login", samples))
+    print(f"{count / wall:.1f} logins/sec, {count / cpu:.1f} logins/sec/core ({cpu:.1f} CPU s in {wall:.1f} s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.concurrency))
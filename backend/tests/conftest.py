@@ -0,0 +1,91 @@
+# backend/tests/conftest.py
+#
+# The app runs against a throwaway SQLite file; settings are read at
+# import time, so the environment is set before `app` is imported.
+
+import itertools
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="sps-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["ARGON2_TIME_COST"] = "1"
+os.environ["ARGON2_MEMORY_COST"] = "1024"
+os.environ["ARGON2_PARALLELISM"] = "1"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, schemas
+from app.database import SessionLocal
+from app.main import app
+
+API = "/api/v1"
+PASSWORD = "password1"
+_ids = itertools.count(1)
+
+
+def unique(prefix: str) -> str:
+    return f"{prefix}{next(_ids)}"
+
+
+def login(client: TestClient, email: str) -> dict:
+    response = client.post(f"{API}/auth/token", data={"username": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client) -> dict:
+    db = SessionLocal()
+    try:
+        crud.create_user(db, schemas.UserCreate(email="admin@tests.io", password=PASSWORD, role="admin"))
+    finally:
+        db.close()
+    return login(client, "admin@tests.io")
+
+
+@pytest.fixture
+def user_headers(client) -> dict:
+    email = f"{unique('user')}@tests.io"
+    response = client.post(f"{API}/auth/signup", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 201, response.text
+    return login(client, email)
+
+
+@pytest.fixture
+def make_slot(client, admin_headers):
+    def make(vehicle_type: str = "Car", price_per_hour: float = 5.0) -> dict:
+        response = client.post(f"{API}/slots/", headers=admin_headers, json={
+            "slot_number": unique("T-"), "vehicle_type": vehicle_type, "price_per_hour": price_per_hour
+        })
+        assert response.status_code == 201, response.text
+        return response.json()
+    return make
+
+
+@pytest.fixture
+def make_vehicle(client):
+    def make(headers: dict) -> dict:
+        response = client.post(f"{API}/users/me/vehicles", headers=headers, json={"license_plate": unique("MH")})
+        assert response.status_code == 201, response.text
+        return response.json()
+    return make
+
+
+@pytest.fixture
+def make_booking(client):
+    def make(headers: dict, slot_id: int, vehicle_id: int, start_time: str, end_time: str) -> dict:
+        response = client.post(f"{API}/bookings/", headers=headers, json={
+            "slot_id": slot_id, "start_time": start_time, "end_time": end_time,
+            "vehicle_id": vehicle_id, "payment_method": "cash"
+        })
+        assert response.status_code == 201, response.text
+        return response.json()
+    return make
@@ -0,0 +1,41 @@
+# backend/tests/test_auth.py
+
+from passlib.context import CryptContext
+
+from app import models
+from app.database import SessionLocal
+
+from conftest import API, PASSWORD, login, unique
+
+
+def test_signup_rejects_duplicate_email(client):
+    email = f"{unique('dup')}@tests.io"
+    first = client.post(f"{API}/auth/signup", json={"email": email, "password": PASSWORD})
+    assert first.status_code == 201, first.text
+    second = client.post(f"{API}/auth/signup", json={"email": email, "password": PASSWORD})
+    assert second.status_code == 400
+
+
+def test_wrong_password_is_rejected(client):
+    email = f"{unique('wrong')}@tests.io"
+    client.post(f"{API}/auth/signup", json={"email": email, "password": PASSWORD})
+    response = client.post(f"{API}/auth/token", data={"username": email, "password": "not-it"})
+    assert response.status_code == 401
+
+
+def test_login_upgrades_hash_made_with_old_parameters(client):
+    email = f"{unique('old')}@tests.io"
+    client.post(f"{API}/auth/signup", json={"email": email, "password": PASSWORD})
+    old_hash = CryptContext(schemes=["argon2"], argon2__time_cost=2, argon2__memory_cost=2048).hash(PASSWORD.encode())
+
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.email == email).one()
+        user.hashed_password = old_hash
+        db.commit()
+        login(client, email)
+        db.expire_all()
+        assert user.hashed_password != old_hash
+    finally:
+        db.close()
+    login(client, email)
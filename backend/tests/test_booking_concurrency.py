@@ -0,0 +1,81 @@
+# backend/tests/test_booking_concurrency.py
+#
+# Many concurrent POST /bookings for a few slots: every request must be
+# answered 201 or 409, every 201 must be in the database, and no two
+# blocking bookings of one slot may overlap.
+
+import asyncio
+import random
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from app import models
+from app.booking_index import BLOCKING_STATUSES
+from app.database import SessionLocal
+from app.main import app
+
+from conftest import API
+
+REQUESTS = 400
+IN_FLIGHT = 100
+SLOTS = 5
+
+
+def _window(hour: int) -> tuple:
+    start = f"2032-01-{1 + hour // 24:02d}T{hour % 24:02d}:00:00"
+    end = f"2032-01-{1 + (hour + 2) // 24:02d}T{(hour + 2) % 24:02d}:00:00"
+    return start, end
+
+
+async def _burst(headers: dict, payloads: list) -> list:
+    # In the app's own event loop (client.portal), over ASGI: no sockets,
+    # so no request can get lost to a keep-alive race
+    semaphore = asyncio.Semaphore(IN_FLIGHT)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as http:
+        async def post(payload):
+            async with semaphore:
+                response = await http.post(f"{API}/bookings/", json=payload)
+                return response.status_code
+
+        return await asyncio.gather(*(post(payload) for payload in payloads))
+
+
+def test_concurrent_bookings_never_overlap(client, user_headers, make_slot, make_vehicle):
+    slot_ids = [make_slot()["id"] for _ in range(SLOTS)]
+    vehicle = make_vehicle(user_headers)
+    rng = random.Random(1)
+    payloads = []
+    for _ in range(REQUESTS):
+        start, end = _window(rng.randrange(0, 48))
+        payloads.append({
+            "slot_id": rng.choice(slot_ids), "start_time": start, "end_time": end,
+            "vehicle_id": vehicle["id"], "payment_method": "cash"
+        })
+
+    codes = client.portal.call(_burst, user_headers, payloads)
+
+    assert len(codes) == REQUESTS
+    assert set(codes) <= {201, 409}, sorted(set(codes))
+    created = codes.count(201)
+    assert created > 0 and codes.count(409) > 0
+
+    other = aliased(models.Booking)
+    db = SessionLocal()
+    try:
+        stored = db.scalar(select(func.count()).select_from(models.Booking).where(models.Booking.slot_id.in_(slot_ids)))
+        overlapping = db.scalar(
+            select(func.count()).select_from(models.Booking).join(other, (other.slot_id == models.Booking.slot_id) & (other.id > models.Booking.id)).where(
+                models.Booking.slot_id.in_(slot_ids),
+                models.Booking.status.in_(BLOCKING_STATUSES),
+                other.status.in_(BLOCKING_STATUSES),
+                models.Booking.start_time < other.end_time,
+                other.start_time < models.Booking.end_time,
+            )
+        )
+    finally:
+        db.close()
+    assert stored == created
+    assert overlapping == 0
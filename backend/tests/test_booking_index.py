@@ -0,0 +1,125 @@
+# backend/tests/test_booking_index.py
+
+from datetime import datetime
+
+from app.booking_index import booking_index
+from app.database import SessionLocal
+
+from conftest import API
+
+
+def _book(client, headers, slot_id, vehicle_id, start, end):
+    return client.post(f"{API}/bookings/", headers=headers, json={
+        "slot_id": slot_id, "start_time": start, "end_time": end,
+        "vehicle_id": vehicle_id, "payment_method": "cash"
+    })
+
+
+def _rebuild_index():
+    # What startup does after a restart: naive datetimes from the DB
+    db = SessionLocal()
+    try:
+        booking_index.rebuild(db)
+    finally:
+        db.close()
+
+
+def test_utc_z_times_against_rebuilt_index(client, user_headers, make_slot, make_vehicle):
+    slot, vehicle = make_slot(), make_vehicle(user_headers)
+    first = _book(client, user_headers, slot["id"], vehicle["id"], "2030-01-01T10:00:00Z", "2030-01-01T12:00:00Z")
+    assert first.status_code == 201, first.text
+    _rebuild_index()
+
+    overlapping = _book(client, user_headers, slot["id"], vehicle["id"], "2030-01-01T11:00:00Z", "2030-01-01T13:00:00Z")
+    assert overlapping.status_code == 409, overlapping.text
+    later = _book(client, user_headers, slot["id"], vehicle["id"], "2030-01-01T12:00:00Z", "2030-01-01T13:00:00Z")
+    assert later.status_code == 201, later.text
+
+    auto = client.post(f"{API}/bookings/auto", headers=user_headers, json={
+        "vehicle_type": slot["vehicle_type"], "start_time": "2030-01-01T14:00:00Z", "end_time": "2030-01-01T15:00:00Z",
+        "vehicle_id": vehicle["id"], "payment_method": "cash"
+    })
+    assert auto.status_code == 201, auto.text
+
+
+def test_naive_times_after_aware_booking_in_same_process(client, user_headers, make_slot, make_vehicle):
+    slot, vehicle = make_slot(), make_vehicle(user_headers)
+    aware = _book(client, user_headers, slot["id"], vehicle["id"], "2030-02-01T10:00:00+05:30", "2030-02-01T12:00:00+05:30")
+    assert aware.status_code == 201, aware.text
+
+    # 04:30-06:30 UTC is taken; 06:30 onwards is free
+    overlapping = _book(client, user_headers, slot["id"], vehicle["id"], "2030-02-01T06:00:00", "2030-02-01T07:00:00")
+    assert overlapping.status_code == 409, overlapping.text
+    after = _book(client, user_headers, slot["id"], vehicle["id"], "2030-02-01T06:30:00", "2030-02-01T07:00:00")
+    assert after.status_code == 201, after.text
+
+
+def test_index_follows_bookings_of_other_workers(client, user_headers, make_slot, make_vehicle):
+    from app.websocket_manager import manager
+
+    slot, vehicle = make_slot(), make_vehicle(user_headers)
+    # A booking made on another worker arrives as a bus message (JSON over the hub)
+    remote = {"kind": "bookings", "op": "add", "slot_id": slot["id"], "booking_id": 10**9,
+              "start_time": "2030-03-01T10:00:00", "end_time": "2030-03-01T12:00:00"}
+    client.portal.call(manager._on_bus_message, remote)
+    assert not booking_index.is_available(slot["id"], datetime(2030, 3, 1, 11), datetime(2030, 3, 1, 13))
+
+    # ... and leaves the index again once checked out there
+    client.portal.call(manager._on_bus_message, {"kind": "bookings", "op": "discard", "slot_id": slot["id"], "booking_id": 10**9})
+    assert booking_index.is_available(slot["id"], datetime(2030, 3, 1, 11), datetime(2030, 3, 1, 13))
+    free = _book(client, user_headers, slot["id"], vehicle["id"], "2030-03-01T11:00:00", "2030-03-01T13:00:00")
+    assert free.status_code == 201, free.text
+
+
+async def _relink():
+    # What the bus does when this worker (re)joins the hub
+    from app.websocket_manager import manager
+
+    manager._on_bus_link()
+    await manager._resync_task
+
+
+def test_relink_resyncs_index_and_board(client, user_headers, make_slot, make_vehicle):
+    from app import models
+
+    slot, vehicle = make_slot(), make_vehicle(user_headers)
+    booked = _book(client, user_headers, slot["id"], vehicle["id"], "2030-04-01T10:00:00", "2030-04-01T12:00:00")
+    assert booked.status_code == 201, booked.text
+    # Changes this worker never heard of while the hub was down
+    client.portal.call(booking_index.discard, slot["id"], booked.json()["id"])
+    db = SessionLocal()
+    try:
+        db.get(models.Slot, slot["id"]).status = models.SlotStatus.maintenance
+        db.commit()
+    finally:
+        db.close()
+
+    client.portal.call(_relink)
+
+    assert not booking_index.is_available(slot["id"], datetime(2030, 4, 1, 11), datetime(2030, 4, 1, 13))
+    listed = {s["id"]: s for s in client.get(f"{API}/slots/", headers=user_headers).json()}
+    assert listed[slot["id"]]["status"] == "maintenance"
+
+
+def test_resync_keeps_changes_made_while_loading(client, make_slot, monkeypatch):
+    slot = make_slot()
+    load = booking_index._load_from_db
+
+    def load_while_a_booking_arrives():
+        loaded = load()
+        booking_index.add(slot["id"], datetime(2030, 5, 1, 10), datetime(2030, 5, 1, 12), 10**9 + 1)
+        return loaded
+
+    monkeypatch.setattr(booking_index, "_load_from_db", load_while_a_booking_arrives)
+    client.portal.call(booking_index.resync)
+    assert not booking_index.is_available(slot["id"], datetime(2030, 5, 1, 11), datetime(2030, 5, 1, 13))
+    client.portal.call(booking_index.discard, slot["id"], 10**9 + 1)
+
+
+def test_stale_index_rejection_is_checked_against_db(client, user_headers, make_slot, make_vehicle):
+    slot, vehicle = make_slot(), make_vehicle(user_headers)
+    # A booking that was cancelled on another worker, whose discard never arrived
+    client.portal.call(booking_index.add, slot["id"], datetime(2030, 6, 1, 10), datetime(2030, 6, 1, 12), 10**9 + 2)
+    booked = _book(client, user_headers, slot["id"], vehicle["id"], "2030-06-01T10:00:00", "2030-06-01T12:00:00")
+    assert booked.status_code == 201, booked.text
+    client.portal.call(booking_index.discard, slot["id"], 10**9 + 2)
@@ -0,0 +1,177 @@
+# backend/tests/test_broadcast_bus.py
+#
+# UnixSocketBus across real processes: three workers on one socket path
+# each publish, every worker must get every message, and again after the
+# hub is killed and another worker takes over.
+
+import asyncio
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import tempfile
+import time
+
+import pytest
+
+from app.broadcast_bus import UnixSocketBus
+
+TIMEOUT = 10
+
+
+def _worker(name: str, path: str, commands, events):
+    """One uvicorn worker's bus: reports links and messages, runs commands."""
+    async def run():
+        loop = asyncio.get_running_loop()
+        bus = UnixSocketBus(path)
+        await bus.start(
+            lambda message: events.send(("got", name, message["text"])),
+            lambda: events.send(("linked", name, bus._lock_fd is not None)),
+        )
+        while True:
+            command, arg = await loop.run_in_executor(None, commands.get)
+            if command == "publish":
+                bus.publish({"kind": "text", "text": arg})
+            elif command == "clients":
+                events.send(("clients", name, len(bus._hub_clients)))
+            elif command == "stop":
+                await bus.stop()
+                return
+
+    asyncio.run(run())
+
+
+class _Cluster:
+    def __init__(self, path: str, names):
+        context = multiprocessing.get_context("spawn")
+        # A pipe per worker: killing the hub must not corrupt a shared queue
+        pipes = {name: context.Pipe(duplex=False) for name in names}
+        self.events = {name: receiver for name, (receiver, _) in pipes.items()}
+        self._senders = [sender for _, sender in pipes.values()]
+        self.commands = {name: context.Queue() for name in names}
+        self.processes = {
+            name: context.Process(target=_worker, args=(name, path, self.commands[name], pipes[name][1]), daemon=True)
+            for name in names
+        }
+        self.received = {name: [] for name in names}
+        self.hubs = set()
+        self.links = {name: 0 for name in names}
+        self.clients = {}
+
+    def start(self):
+        for process in self.processes.values():
+            process.start()
+        for sender in self._senders:
+            sender.close()  # the workers hold theirs; EOF once one dies
+
+    def wait_for(self, condition, what: str):
+        deadline = time.monotonic() + TIMEOUT
+        while not condition():
+            ready = multiprocessing.connection.wait(list(self.events.values()), max(0.0, deadline - time.monotonic()))
+            if not ready:
+                pytest.fail(f"timed out waiting for {what}")
+            for receiver in ready:
+                try:
+                    self._record(*receiver.recv())
+                except EOFError:  # that worker is gone
+                    self.events = {name: r for name, r in self.events.items() if r is not receiver}
+
+    def _record(self, kind: str, name: str, value):
+        if kind == "got":
+            self.received[name].append(value)
+        elif kind == "linked":
+            self.links[name] += 1
+            if value:
+                self.hubs.add(name)
+        elif kind == "clients":
+            self.clients[name] = value
+
+    def wait_for_hub(self, hub: str, clients: int):
+        # The hub registers a client just after that client sees its link
+        deadline = time.monotonic() + TIMEOUT
+        while time.monotonic() < deadline:
+            self.clients.pop(hub, None)
+            self.commands[hub].put(("clients", None))
+            self.wait_for(lambda: hub in self.clients, f"{hub} to report its clients")
+            if self.clients[hub] == clients:
+                return
+            time.sleep(0.05)
+        pytest.fail(f"{hub} has {self.clients[hub]} clients, expected {clients}")
+
+    def publish_from_each(self, names, tag: str):
+        for name in names:
+            self.commands[name].put(("publish", f"{tag}-{name}"))
+        expected = sorted(f"{tag}-{name}" for name in names)
+        self.wait_for(
+            lambda: all(sorted(m for m in self.received[n] if m.startswith(tag)) == expected for n in names),
+            f"every worker to get {expected}"
+        )
+
+    def stop(self):
+        for name, process in self.processes.items():
+            if process.is_alive():
+                self.commands[name].put(("stop", None))
+        for process in self.processes.values():
+            process.join(timeout=TIMEOUT)
+            if process.is_alive():
+                process.kill()
+
+
+@pytest.fixture
+def socket_path():
+    # Short path: Unix socket paths are limited to ~100 bytes
+    directory = tempfile.mkdtemp(prefix="sps-bus-")
+    yield os.path.join(directory, "bus.sock")
+
+
+def test_every_worker_gets_every_message_across_hub_failover(socket_path):
+    names = ["a", "b", "c"]
+    cluster = _Cluster(socket_path, names)
+    cluster.start()
+    try:
+        cluster.wait_for(lambda: all(cluster.links.values()), "all workers to link")
+        assert len(cluster.hubs) == 1
+        hub = cluster.hubs.pop()
+        cluster.wait_for_hub(hub, clients=2)
+        cluster.publish_from_each(names, "before")
+
+        os.kill(cluster.processes[hub].pid, signal.SIGKILL)
+        cluster.processes[hub].join(timeout=TIMEOUT)
+        survivors = [name for name in names if name != hub]
+        # (a survivor may briefly link to the dying hub first, hence no link count)
+        cluster.wait_for(lambda: cluster.hubs, "a survivor to take over as hub")
+        assert len(cluster.hubs) == 1 and cluster.hubs <= set(survivors)
+        cluster.wait_for_hub(next(iter(cluster.hubs)), clients=1)
+        cluster.publish_from_each(survivors, "after")
+    finally:
+        cluster.stop()
+
+
+def test_hub_drops_a_worker_that_stops_reading(socket_path):
+    async def run():
+        bus = UnixSocketBus(socket_path)
+        bus.MAX_BUFFERED_BYTES = 256 * 1024
+        linked = asyncio.Event()
+        await bus.start(lambda message: None, linked.set)
+        try:
+            await linked.wait()
+            _, stalled = await asyncio.open_unix_connection(socket_path)  # never reads
+            while not bus._hub_clients:
+                await asyncio.sleep(0.01)
+
+            text = "x" * 64 * 1024
+            for _ in range(1000):  # 64 MiB if nothing were dropped
+                bus.publish({"kind": "text", "text": text})
+                if not bus._hub_clients:
+                    break
+                await asyncio.sleep(0)
+            for _ in range(100):
+                if not bus._hub_clients:
+                    break
+                await asyncio.sleep(0.01)
+            assert not bus._hub_clients
+            stalled.close()
+        finally:
+            await bus.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,45 @@
+# backend/tests/test_db_pool.py
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.db_pool import InstrumentedQueuePool, pool_stats
+
+
+def test_pool_stats_count_checkouts_overflow_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    first = engine.connect()
+    second = engine.connect()  # beyond pool_size: an overflow connection
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    stats = pool_stats(engine.pool)
+    assert stats["pool_size"] == 1
+    assert stats["max_overflow"] == 1
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["overflow_events"] == 1
+    assert stats["timeouts"] == 1
+    assert sum(stats["wait_ms"]["histogram"].values()) == 3
+    assert stats["wait_ms"]["max"] >= 50
+
+    second.close()
+    first.close()
+    with engine.connect():
+        pass  # reuses a pooled connection: no new overflow
+    stats = pool_stats(engine.pool)
+    assert stats["checkouts"] == 3
+    assert stats["overflow_events"] == 1
+    engine.dispose()
+
+
+def test_db_pool_route_reports_both_engines(client, admin_headers):
+    response = client.get("/api/v1/admin/db-pool", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["sync"]["checkouts"] > 0
+    assert body["async"]["checkouts"] > 0
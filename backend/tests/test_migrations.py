@@ -0,0 +1,34 @@
+# backend/tests/test_migrations.py
+
+import multiprocessing
+
+from sqlalchemy import create_engine, select
+
+from app.migrations import MIGRATIONS, run_migrations, schema_version
+
+
+def _start_worker(url: str, errors):
+    # What each uvicorn worker does at import of app.main
+    try:
+        run_migrations(create_engine(url))
+    except Exception as exc:
+        errors.put(repr(exc))
+
+
+def test_workers_starting_together_migrate_once(tmp_path):
+    url = f"sqlite:///{tmp_path}/workers.db"
+    context = multiprocessing.get_context("spawn")
+    errors = context.Queue()
+    workers = [context.Process(target=_start_worker, args=(url, errors)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+    assert [worker.exitcode for worker in workers] == [0] * len(workers)
+    assert errors.empty(), errors.get()
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        applied = conn.execute(select(schema_version.c.version).order_by(schema_version.c.version)).scalars().all()
+    engine.dispose()
+    assert applied == [version for version, _, _ in MIGRATIONS]
@@ -0,0 +1,139 @@
+# backend/tests/test_occupancy.py
+#
+# occupancy.py against plain per-interval loops.
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import models, occupancy
+from app.database import Base
+from app.occupancy import BUCKET_SECONDS, OccupancyStore, _covered_seconds
+
+DATE_FROM = datetime(2024, 3, 1)
+DATE_TO = datetime(2024, 3, 4)
+VEHICLE_TYPES = ["Bike", "Car", "Truck"]
+STATUSES = list(models.SlotStatus)
+
+
+def test_covered_seconds_matches_loop():
+    rng = np.random.default_rng(7)
+    n_groups, n = 4, 300
+    groups = rng.integers(0, n_groups, n)
+    starts = rng.integers(0, 10_000, n)
+    ends = starts + rng.integers(0, 2_000, n)
+    edges = np.arange(0, 13_000, 700, dtype=np.int64)
+
+    expected = np.zeros((n_groups, len(edges)), dtype=np.int64)
+    for group, start, end in zip(groups, starts, ends):
+        for j, edge in enumerate(edges):
+            expected[group, j] += max(0, min(end, edge) - start)
+
+    assert np.array_equal(_covered_seconds(groups, starts, ends, n_groups, edges), expected)
+
+
+def _history(rng):
+    """
+    (slots, events in insert order). Some slots get deleted, and the second
+    half of the events is back-dated: inserted later, but earlier in time
+    than events already stored.
+    """
+    slots = [
+        models.Slot(id=i, slot_number=f"O-{i}", vehicle_type=VEHICLE_TYPES[i % 3], price_per_hour=1.0)
+        for i in range(1, 13)
+    ]
+    deleted = {3, 8}
+    start = DATE_FROM - timedelta(hours=6)
+    events = []
+    for slot in slots:
+        events.append((slot.id, models.SlotStatus.available, start))
+        for _ in range(12):
+            offset = timedelta(seconds=int(rng.integers(0, 80 * 3600)))
+            events.append((slot.id, STATUSES[rng.integers(0, len(STATUSES))], start + offset))
+        if slot.id in deleted:
+            events.append((slot.id, None, DATE_FROM + timedelta(hours=40)))
+    first, second = events[::2], events[1::2]
+    return [slot for slot in slots if slot.id not in deleted], first, second
+
+
+def _expected(events, current_slots, group_by, include_reserved, bucket):
+    """Occupied / existing seconds per group and bucket, one interval at a time."""
+    occupied_statuses = {models.SlotStatus.booked}
+    if include_reserved:
+        occupied_statuses.add(models.SlotStatus.reserved)
+    edges = []
+    edge = DATE_FROM
+    while edge < DATE_TO:
+        edges.append(edge)
+        edge += timedelta(seconds=bucket)
+    edges.append(edge)
+
+    types = {slot.id: slot.vehicle_type for slot in current_slots}
+    numbers = {slot.id: slot.slot_number for slot in current_slots}
+    by_slot = {}
+    for order, (slot_id, status, changed_at) in enumerate(events):
+        by_slot.setdefault(slot_id, []).append((changed_at, order, status))
+
+    occupied, existing = {}, {}
+    for slot_id, history in by_slot.items():
+        if group_by == "total":
+            key = "all"
+        elif group_by == "vehicle_type":
+            if slot_id not in types:
+                continue
+            key = types[slot_id]
+        else:
+            key = numbers.get(slot_id, f"#{slot_id} (deleted)")
+        history.sort()
+        for i, (changed_at, _, status) in enumerate(history):
+            end = history[i + 1][0] if i + 1 < len(history) else datetime(2100, 1, 1)
+            if status is None:
+                continue
+            for j in range(len(edges) - 1):
+                overlap = (min(end, edges[j + 1]) - max(changed_at, edges[j])).total_seconds()
+                if overlap > 0:
+                    existing.setdefault(key, [0.0] * (len(edges) - 1))[j] += overlap
+                    if status in occupied_statuses:
+                        occupied.setdefault(key, [0.0] * (len(edges) - 1))[j] += overlap
+    return {
+        key: (np.array(occupied.get(key, [0.0] * len(seconds))), np.array(seconds))
+        for key, seconds in existing.items()
+    }
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.mark.parametrize("merge_batch", [3, occupancy.MERGE_BATCH])
+@pytest.mark.parametrize("group_by", ["total", "vehicle_type", "slot"])
+@pytest.mark.parametrize("granularity", ["hour", "day"])
+def test_occupancy_matches_loop(db, monkeypatch, merge_batch, group_by, granularity):
+    monkeypatch.setattr(occupancy, "MERGE_BATCH", merge_batch)
+    slots, first, second = _history(np.random.default_rng(11))
+    db.add_all(slots)
+    store = OccupancyStore()
+    for batch in (first, second):
+        db.add_all(models.SlotStatusEvent(slot_id=slot_id, status=status, changed_at=changed_at) for slot_id, status, changed_at in batch)
+        db.commit()
+        store.refresh(db)
+
+    for include_reserved in (False, True):
+        result = store.occupancy(db, DATE_FROM, DATE_TO, granularity, group_by, include_reserved)
+        expected = _expected(first + second, slots, group_by, include_reserved, BUCKET_SECONDS[granularity])
+
+        assert sorted(series["key"] for series in result["series"]) == sorted(expected)
+        for series in result["series"]:
+            occupied, existing = expected[series["key"]]
+            ratio = np.divide(occupied, existing, out=np.full(len(existing), np.nan), where=existing > 0)
+            assert np.allclose(series["occupancy"], ratio, atol=1e-4, equal_nan=True), series["key"]
+            assert series["utilization"] == pytest.approx(occupied.sum() / existing.sum(), abs=1e-4)
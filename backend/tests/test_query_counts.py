@@ -0,0 +1,71 @@
+# backend/tests/test_query_counts.py
+#
+# The list routes must run a fixed number of statements, however many
+# rows they return (no lazy loads per row).
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import crud, models, schemas
+from app.database import SessionLocal, engine
+
+from conftest import API, PASSWORD, login, unique
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _statements_for(client, url: str, headers: dict, expected_rows: int) -> int:
+    client.get(url, headers=headers)  # warms the principal cache
+    with count_statements() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == expected_rows
+    return len(statements)
+
+
+@pytest.fixture
+def seed(client, user_headers, make_slot, make_vehicle, make_booking):
+    """N bookings for the current user, each with a payment and two gate logs by one staff member."""
+    def make(n: int):
+        # Own slot and vehicle per booking, so per-row lazy loads would show
+        bookings = []
+        for _ in range(n):
+            vehicle = make_vehicle(user_headers)
+            bookings.append(make_booking(user_headers, make_slot()["id"], vehicle["id"], "2031-01-01T10:00:00", "2031-01-01T11:00:00"))
+        staff_email = f"{unique('staff')}@tests.io"
+        db = SessionLocal()
+        try:
+            staff = crud.create_user(db, schemas.UserCreate(email=staff_email, password=PASSWORD, role="staff"))
+            for booking in bookings:
+                crud.create_payment_record(db, booking["id"], 10.0, unique("order_"))
+                for action in ("check-in", "check-out"):
+                    db.add(models.GateLog(staff_id=staff.id, booking_id=booking["id"], action=action, vehicle_plate=vehicle["license_plate"]))
+            db.commit()
+            staff_id = staff.id
+        finally:
+            db.close()
+        return staff_id, login(client, staff_email)
+    return make
+
+
+@pytest.mark.parametrize("n", [1, 10])
+def test_list_routes_run_one_statement(client, user_headers, seed, n):
+    staff_id, staff_headers = seed(n)
+
+    assert _statements_for(client, f"{API}/bookings/me", user_headers, n) == 1
+    assert _statements_for(client, f"{API}/users/me/payments", user_headers, n) == 1
+    assert _statements_for(client, f"{API}/gate/logs?staff_id={staff_id}", staff_headers, 2 * n) == 1
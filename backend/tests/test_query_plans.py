@@ -0,0 +1,156 @@
+# backend/tests/test_query_plans.py
+#
+# Query-plan regression check for the hot crud queries.
+#
+# Builds an empty in-memory SQLite database from the models and
+# migrations, runs each hot crud function while recording the SQL it
+# sends, and runs EXPLAIN QUERY PLAN on every statement. Fails if any of
+# them scans a table or walks an index from its start. Only first-page
+# list queries may "SCAN ... USING INDEX" (an ordered walk stopped by the
+# LIMIT); their next pages must seek into the index on the sort column.
+
+import asyncio
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import crud, crud_async, models, schemas
+from app.database import Base
+from app.migrations import run_migrations
+from app.occupancy import OccupancyStore
+from app.pagination import PageParams, encode_cursor
+
+START = datetime(2030, 1, 1, 10, 0)
+END = datetime(2030, 1, 1, 12, 0)
+
+
+def _page(cursor_values=None) -> PageParams:
+    return PageParams(limit=100, cursor=encode_cursor(cursor_values) if cursor_values else None)
+
+
+class _SyncAsAsync:
+    """Lets crud_async functions run on a sync Session (they only await db.execute)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def execute(self, statement):
+        return self.db.execute(statement)
+
+
+def _run_async(function, db: Session, *args, **kwargs):
+    return asyncio.run(function(_SyncAsAsync(db), *args, **kwargs))
+
+
+# (name, crud call) - add new hot paths here
+HOT_QUERIES: List[Tuple[str, Callable[[Session], object]]] = [
+    ("user by email", lambda db: crud.get_user_by_email(db, "a@b.c")),
+    ("user by email (async)", lambda db: _run_async(crud_async.get_user_by_email, db, "a@b.c")),
+    ("slot overlap check", lambda db: _run_async(crud_async.check_slot_availability, db, 1, START, END)),
+    ("free slots by vehicle type", lambda db: _run_async(crud_async.rank_free_slots, db, "Car", START, END)),
+    ("bulk slot create", lambda db: crud.create_slots_bulk(db, schemas.SlotBulkCreate(
+        ranges=[schemas.SlotRange(pattern="P-01..P-03", vehicle_type="Car", price_per_hour=5.0)]
+    ))),
+    ("bulk slot update", lambda db: crud.update_slots_bulk(db, schemas.SlotBulkUpdate(
+        changes=[schemas.SlotBulkChange(pattern="P-01..P-03", status=models.SlotStatus.maintenance)]
+    ))),
+    ("slot status events since id", lambda db: OccupancyStore().refresh(db)),
+    ("booking by id string", lambda db: crud.get_booking_by_id_str(db, "SPS-1001")),
+    ("payment by provider id", lambda db: crud.update_payment_record(db, "order_x", "pay_x", "completed")),
+    ("my bookings", lambda db: crud.get_bookings_by_user(db, 1, _page())),
+    ("my bookings by status", lambda db: crud.get_bookings_by_user(db, 1, _page(), status=models.BookingStatus.active)),
+    ("my bookings by slot", lambda db: crud.get_bookings_by_user(db, 1, _page(), slot_id=1)),
+    ("my payments", lambda db: crud.get_payments_by_user(db, 1, _page())),
+    ("my vehicles", lambda db: crud.get_vehicles_by_user(db, 1, _page())),
+    ("gate logs by staff", lambda db: crud.get_gate_logs(db, _page(), staff_id=1)),
+    ("gate logs by action", lambda db: crud.get_gate_logs(db, _page(), action="check-in")),
+    ("gate logs by date", lambda db: crud.get_gate_logs(db, _page(), date_from=START, date_to=END)),
+    ("gate logs by slot", lambda db: crud.get_gate_logs(db, _page(), slot_id=1)),
+    ("users by role", lambda db: crud.get_users(db, _page(), role=models.UserRole.staff)),
+]
+
+# First pages in the full sort order, which may walk the sort index
+FIRST_PAGE_QUERIES: List[Tuple[str, Callable[[Session], object]]] = [
+    ("gate logs", lambda db: crud.get_gate_logs(db, _page())),
+]
+
+# (name, crud call, range the plan must seek on) - pages after a cursor
+NEXT_PAGE_QUERIES: List[Tuple[str, Callable[[Session], object], str]] = [
+    ("my bookings, next page", lambda db: crud.get_bookings_by_user(db, 1, _page([START, 5])), "start_time<?"),
+    ("gate logs, next page", lambda db: crud.get_gate_logs(db, _page([START, 5])), "timestamp<?"),
+    ("gate logs by slot, next page",
+     lambda db: crud.get_gate_logs(db, _page([START, 5]), slot_id=1), "timestamp<?"),
+]
+
+
+def _scans(plan_rows, allow_index_walk: bool) -> List[str]:
+    # Row detail looks like "SCAN bookings" or "SEARCH bookings USING INDEX ..."
+    return [
+        row[-1] for row in plan_rows
+        if row[-1].startswith("SCAN ") and not (allow_index_walk and " USING " in row[-1])
+    ]
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+def _query_plans(engine, run) -> List[Tuple[str, list]]:
+    """Runs `run`, returning each SELECT it sent with its EXPLAIN QUERY PLAN rows."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as db:
+            run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements, "no SELECT recorded"
+    with engine.connect() as conn:
+        return [
+            (" ".join(statement.split()), conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all())
+            for statement, parameters in statements
+        ]
+
+
+def _assert_no_scans(plans, allow_index_walk: bool = False):
+    scans = [
+        f"{scan}\n    {statement}"
+        for statement, plan in plans
+        for scan in _scans(plan, allow_index_walk)
+    ]
+    assert not scans, "table scan:\n" + "\n".join(scans)
+
+
+@pytest.mark.parametrize("name, run", HOT_QUERIES, ids=[name for name, _ in HOT_QUERIES])
+def test_hot_query_uses_indexes(plan_engine, name, run):
+    _assert_no_scans(_query_plans(plan_engine, run))
+
+
+@pytest.mark.parametrize("name, run", FIRST_PAGE_QUERIES, ids=[name for name, _ in FIRST_PAGE_QUERIES])
+def test_first_page_walks_an_index(plan_engine, name, run):
+    _assert_no_scans(_query_plans(plan_engine, run), allow_index_walk=True)
+
+
+@pytest.mark.parametrize("name, run, seek", NEXT_PAGE_QUERIES, ids=[name for name, _, _ in NEXT_PAGE_QUERIES])
+def test_next_page_seeks_on_sort_column(plan_engine, name, run, seek):
+    plans = _query_plans(plan_engine, run)
+    _assert_no_scans(plans)
+    details = [row[-1] for _, plan in plans for row in plan]
+    assert any(d.startswith("SEARCH ") and seek in d for d in details), (
+        f"no index seek on {seek!r}:\n" + "\n".join(details)
+    )
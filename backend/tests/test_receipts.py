@@ -0,0 +1,26 @@
+# backend/tests/test_receipts.py
+
+from conftest import API
+
+
+def test_receipt_conditional_get(client, admin_headers, user_headers, make_slot, make_vehicle, make_booking):
+    slot, vehicle = make_slot(), make_vehicle(user_headers)
+    booking = make_booking(user_headers, slot["id"], vehicle["id"], "2030-04-01T10:00:00", "2030-04-01T12:00:00")
+    url = f"{API}/bookings/receipt/{booking['id']}"
+
+    first = client.get(url, headers=user_headers)
+    assert first.status_code == 200
+    assert first.content.startswith(b"%PDF")
+    etag = first.headers["etag"]
+
+    cached = client.get(url, headers={**user_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    # A printed field changes -> new ETag, full response
+    updated = client.put(f"{API}/slots/{slot['id']}", headers=admin_headers, json={**slot, "price_per_hour": 9.0})
+    assert updated.status_code == 200, updated.text
+    changed = client.get(url, headers={**user_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
@@ -0,0 +1,20 @@
+# backend/tests/test_security.py
+
+import jwt as pyjwt
+import pytest
+from jose import jwt
+
+from app.core.config import settings
+from app.security import create_access_token
+
+
+def test_pyjwt_accepts_tokens_issued_by_jose():
+    token = create_access_token({"sub": "someone@tests.io"})
+    claims = pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert claims == jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def test_pyjwt_rejects_tampered_tokens():
+    token = create_access_token({"sub": "someone@tests.io"})
+    with pytest.raises(pyjwt.PyJWTError):
+        pyjwt.decode(token.rsplit(".", 1)[0] + "." + "A" * 43, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
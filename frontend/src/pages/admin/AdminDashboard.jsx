@@ -2,6 +2,7 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../../contexts/AuthContext';
 import { getAdminStats } from '../../services/api';
+import { subscribeToStats } from '../../services/slotStream';
 
 // Reusable component for the summary cards
 function DashboardCard({ title, value, color, children }) {
@@ -34,6 +35,12 @@ function AdminDashboard() {
       setLoading(false);
     };
     fetchStats();
+
+    // Keep the cards live after the first load
+    return subscribeToStats((data) => {
+      setStats(data);
+      setLoading(false);
+    });
   }, []);
 
   if (loading) {
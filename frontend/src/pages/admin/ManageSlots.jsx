@@ -1,6 +1,7 @@
 // frontend/src/pages/ManageSlots.jsx
 import React, { useState, useEffect } from 'react';
 import { getSlots, createSlot, updateSlot, deleteSlot } from '../..//services/api';
+import { subscribeToSlots } from '../../services/slotStream';
 
 
 // --- Reusable Modal Component ---
@@ -79,22 +80,12 @@ function ManageSlots() {
     setLoading(false);
   };
 
+  // Live WebSocket: snapshot on connect, then deltas (no initial GET needed)
   useEffect(() => {
-    fetchSlots();
-  }, []);
-
-  // Live WebSocket (No changes)
-  useEffect(() => {
-    const ws = new WebSocket('ws://localhost:8000/ws/slots');
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      if (data.type === 'slot_update') {
-        setSlots((prevSlots) => 
-          prevSlots.map((slot) => slot.id === data.slot.id ? data.slot : slot)
-        );
-      }
-    };
-    return () => ws.close();
+    return subscribeToSlots((liveSlots) => {
+      setSlots(liveSlots);
+      setLoading(false);
+    });
   }, []);
 
   // --- Modal Close Function ---
@@ -11,17 +11,22 @@ function formatDateTime(isoString) {
   });
 }
 
+const PAGE_SIZE = 100;
+
 function GateLogs() {
   const [logs, setLogs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
 
   useEffect(() => {
     const fetchLogs = async () => {
       try {
         setLoading(true);
-        const data = await getGateLogs();
-        setLogs(data);
+        const page = await getGateLogs({ limit: PAGE_SIZE });
+        setLogs(page.items);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         setError('Failed to fetch gate logs.');
       }
@@ -30,6 +35,18 @@ function GateLogs() {
     fetchLogs();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await getGateLogs({ limit: PAGE_SIZE, cursor: nextCursor });
+      setLogs((prev) => prev.concat(page.items));
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError('Failed to fetch gate logs.');
+    }
+    setLoadingMore(false);
+  };
+
   if (loading) return <p>Loading logs...</p>;
   
   return (
@@ -63,6 +80,11 @@ function GateLogs() {
             )}
           </tbody>
         </table>
+        {nextCursor && (
+          <button onClick={loadMore} disabled={loadingMore} style={{marginTop: '1rem'}}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -1,6 +1,7 @@
 // frontend/src/pages/user/BookSlot.jsx
 import React, { useState, useEffect } from 'react';
-import { getSlots, createBooking, getMyVehicles, createRazorpayOrder, verifyPayment } from '../../services/api';
+import { createBooking, getMyVehicles, createRazorpayOrder, verifyPayment } from '../../services/api';
+import { subscribeToSlots } from '../../services/slotStream';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../contexts/AuthContext';
 
@@ -50,9 +51,6 @@ function BookSlot() {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const slotsData = await getSlots();
-        setSlots(slotsData);
-        
         const vehiclesData = await getMyVehicles();
         setVehicles(vehiclesData);
         if (vehiclesData.length > 0) {
@@ -66,20 +64,8 @@ function BookSlot() {
     fetchData();
   }, []);
 
-  useEffect(() => {
-    const ws = new WebSocket('ws://localhost:8000/ws/slots');
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      if (data.type === 'slot_update') {
-        setSlots((prevSlots) => 
-          prevSlots.map((slot) => 
-            slot.id === data.slot.id ? data.slot : slot
-          )
-        );
-      }
-    };
-    return () => ws.close();
-  }, []); 
+  // Slots come from the live board: snapshot on connect, then deltas
+  useEffect(() => subscribeToSlots(setSlots), []);
 
   // Razorpay modal opener & verification
   const displayRazorpay = async (booking) => {
@@ -34,16 +34,58 @@ export const getMe = async () => {
 };
 export const logout = () => {
   localStorage.removeItem('token');
+  etagCache.clear();
 };
 
-// --- APP FUNCTIONS ---
-export const getSlots = async () => {
+// --- Paginated lists ---
+// List routes return one page; the cursor of the next page comes in the
+// X-Next-Cursor header (absent on the last page).
+const getPage = async (path, params = {}) => {
   const token = getToken();
-  const response = await axios.get(`${API_URL}/slots/`, {
+  const response = await axios.get(`${API_URL}${path}`, {
     headers: { Authorization: `Bearer ${token}` },
+    params,
+  });
+  return { items: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
+// For short lists the UI shows in full: follows the cursor to the end.
+const getAllPages = async (path, params = {}) => {
+  let items = [];
+  let cursor = null;
+  do {
+    const page = await getPage(path, { ...params, limit: 1000, ...(cursor ? { cursor } : {}) });
+    items = items.concat(page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+};
+
+// --- Conditional GETs ---
+// Remembers the last body and ETag per URL. The next request sends
+// If-None-Match, and on a 304 the remembered body is reused.
+const etagCache = new Map();
+const getWithETag = async (path, params = {}) => {
+  const token = getToken();
+  const key = `${path}?${new URLSearchParams(params)}`;
+  const cached = etagCache.get(key);
+  const response = await axios.get(`${API_URL}${path}`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+      ...(cached ? { 'If-None-Match': cached.etag } : {}),
+    },
+    params,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
   });
+  if (response.status === 304 && cached) return cached.data;
+  if (response.headers.etag) {
+    etagCache.set(key, { etag: response.headers.etag, data: response.data });
+  }
   return response.data;
 };
+
+// --- APP FUNCTIONS ---
+export const getSlots = async (filters = {}) => getWithETag('/slots/', filters);
 export const createSlot = async (slotNumber, vehicleType, price) => {
   const token = getToken();
   const response = await axios.post(
@@ -75,6 +117,26 @@ export const deleteSlot = async (slotId) => {
   );
   return response.data;
 };
+// ranges: [{ pattern: 'L2-A001..L2-A400', vehicle_type, price_per_hour, status }]
+export const createSlotsBulk = async ({ slots = [], ranges = [] }) => {
+  const token = getToken();
+  const response = await axios.post(
+    `${API_URL}/slots/bulk`,
+    { slots, ranges },
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+  return response.data;
+};
+// changes: [{ pattern: 'L2-A001..L2-A100', status: 'maintenance' }]
+export const updateSlotsBulk = async (changes) => {
+  const token = getToken();
+  const response = await axios.patch(
+    `${API_URL}/slots/bulk`,
+    { changes },
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+  return response.data;
+};
 
 // --- USER BOOKING FUNCTIONS ---
 
@@ -97,13 +159,7 @@ export const createBooking = async (slotId, startTime, endTime, vehicleId, payme
 };
 
 // --- ADD THIS FUNCTION ---
-export const getMyBookings = async () => {
-  const token = getToken();
-  const response = await axios.get(`${API_URL}/bookings/me`, {
-    headers: { Authorization: `Bearer ${token}` },
-  });
-  return response.data;
-};
+export const getMyBookings = async (filters = {}) => getAllPages('/bookings/me', filters);
 
 // --- ADD THIS FUNCTION ---
 export const getReceipt = async (bookingId) => {
@@ -171,13 +227,7 @@ export const changePassword = async (currentPassword, newPassword) => {
 
 // --- ADMIN FUNCTIONS ---
 
-export const getAllUsers = async () => {
-  const token = getToken();
-  const response = await axios.get(`${API_URL}/admin/users`, {
-    headers: { Authorization: `Bearer ${token}` },
-  });
-  return response.data;
-};
+export const getAllUsers = async (filters = {}) => getAllPages('/admin/users', filters);
 
 export const createUserByAdmin = async (email, password, role) => {
   const token = getToken();
@@ -194,10 +244,14 @@ export const createUserByAdmin = async (email, password, role) => {
 };
 
 // --- ADD THIS FUNCTION ---
-export const getAdminStats = async () => {
+export const getAdminStats = async () => getWithETag('/admin/stats');
+
+// params: { date_from, date_to, granularity: 'hour' | 'day', group_by: 'total' | 'vehicle_type' | 'slot', include_reserved }
+export const getOccupancy = async (params = {}) => {
   const token = getToken();
-  const response = await axios.get(`${API_URL}/admin/stats`, {
+  const response = await axios.get(`${API_URL}/admin/analytics/occupancy`, {
     headers: { Authorization: `Bearer ${token}` },
+    params,
   });
   return response.data;
 };
@@ -207,13 +261,7 @@ export const getAdminStats = async () => {
 
 // --- ADD THESE NEW FUNCTIONS ---
 
-export const getMyVehicles = async () => {
-  const token = getToken();
-  const response = await axios.get(`${API_URL}/users/me/vehicles`, {
-    headers: { Authorization: `Bearer ${token}` },
-  });
-  return response.data;
-};
+export const getMyVehicles = async () => getAllPages('/users/me/vehicles');
 
 export const addVehicle = async (license_plate, make, model) => {
   const token = getToken();
@@ -260,18 +308,8 @@ export const verifyPayment = async (paymentData) => {
 };
 
 
-export const getMyPayments = async () => {
-  const token = getToken();
-  const response = await axios.get(`${API_URL}/users/me/payments`, {
-    headers: { Authorization: `Bearer ${token}` },
-  });
-  return response.data;
-};
+export const getMyPayments = async (filters = {}) => getAllPages('/users/me/payments', filters);
 
-export const getGateLogs = async () => {
-  const token = getToken();
-  const response = await axios.get(`${API_URL}/gate/logs`, {
-    headers: { Authorization: `Bearer ${token}` },
-  });
-  return response.data;
-};
\ No newline at end of file
+// One page of logs: { items, nextCursor }. Pass nextCursor back as `cursor`
+// for the next page; filters: staff_id, action, slot_id, date_from, date_to.
+export const getGateLogs = async (params = {}) => getPage('/gate/logs', params);
\ No newline at end of file
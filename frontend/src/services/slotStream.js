@@ -0,0 +1,107 @@
+// frontend/src/services/slotStream.js
+const WS_URL = 'ws://localhost:8000/ws/slots';
+const STATS_WS_URL = 'ws://localhost:8000/ws/stats';
+const RECONNECT_DELAY_MS = 2000;
+
+// Keeps a live copy of the slot board from /ws/slots.
+// The server sends a snapshot on connect, then versioned deltas. On reconnect
+// we send our last version so the server only sends what we missed.
+// Live deltas must arrive as version + 1; the server may drop deltas for a
+// slow connection, so on a gap we reconnect right away and catch up.
+// `onSlots` gets the full slot list after every update.
+// Returns an unsubscribe function (use it as a useEffect cleanup).
+export const subscribeToSlots = (onSlots) => {
+  const slots = new Map();
+  let ws = null;
+  let epoch = null;
+  let version = null;
+  let closed = false;
+  let retryTimer = null;
+
+  const connect = () => {
+    const query = version !== null ? `?since=${version}&epoch=${epoch}` : '';
+    const socket = new WebSocket(`${WS_URL}${query}`);
+    // The first message brings us up to date (snapshot or catch-up delta)
+    let synced = false;
+    ws = socket;
+
+    socket.onmessage = (event) => {
+      if (socket !== ws) return;
+      const data = JSON.parse(event.data);
+      if (data.type === 'slot_snapshot') {
+        slots.clear();
+        data.slots.forEach((slot) => slots.set(slot.id, slot));
+      } else if (data.type === 'slot_delta') {
+        if (synced && data.version !== version + 1) {
+          // Missed a delta: drop this socket and resume from `version`
+          socket.onclose = null;
+          socket.close();
+          connect();
+          return;
+        }
+        data.slots.forEach((slot) => {
+          if (slot.deleted) {
+            slots.delete(slot.id);
+          } else {
+            slots.set(slot.id, slot);
+          }
+        });
+      } else {
+        return;
+      }
+      synced = true;
+      epoch = data.epoch;
+      version = data.version;
+      onSlots(Array.from(slots.values()).sort((a, b) => a.id - b.id));
+    };
+
+    socket.onclose = () => {
+      if (!closed && socket === ws) {
+        retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+      }
+    };
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (ws) ws.close();
+  };
+};
+
+// Live admin dashboard counters from /ws/stats (admin token required).
+// `onStats` gets the whole stats object on connect and after every change.
+// Returns an unsubscribe function.
+export const subscribeToStats = (onStats) => {
+  let ws = null;
+  let closed = false;
+  let retryTimer = null;
+
+  const connect = () => {
+    const token = localStorage.getItem('token');
+    ws = new WebSocket(`${STATS_WS_URL}?token=${encodeURIComponent(token || '')}`);
+
+    ws.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === 'stats') {
+        onStats(data.stats);
+      }
+    };
+
+    ws.onclose = () => {
+      if (!closed) {
+        retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+      }
+    };
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (ws) ws.close();
+  };
+};